@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк переиспользования keep-alive соединений при экспорте
+
+Сравнивает стандартный пул requests.Session (10 соединений, лишние соединения
+закрываются) с пулом TMSClient, размер которого равен числу воркеров. Разница
+видна только при числе воркеров больше 10: стандартный пул открывает новые
+соединения и отбрасывает их с предупреждением urllib3 "Connection pool is full".
+Печатает число открытых соединений, отброшенных соединений и долю запросов,
+выполненных через уже открытое соединение.
+
+Пример:
+    python benchmarks/bench_connection_reuse.py --cases 1000 --workers 16 32 64
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import TMSClient  # noqa: E402
+from fake_server import FakeTMSServer  # noqa: E402
+
+
+class PoolFullCounter(logging.Handler):
+    """Подсчет предупреждений urllib3 об отброшенных соединениях"""
+    
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+        
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.getMessage().startswith('Connection pool is full'):
+            self.count += 1
+
+
+def run(base_url: str, workers: int, sized_pool: bool, discards: PoolFullCounter) -> dict:
+    """Загрузка всех кейсов проекта и статистика соединений клиента"""
+    client = TMSClient(base_url, 'bench@example.com', 'bench', max_concurrency=workers)
+    if not sized_pool:
+        # Стандартный адаптер requests: пул на 10 соединений без ожидания свободного
+        adapter = requests.adapters.HTTPAdapter()
+        client.session.mount('http://', adapter)
+        client.session.mount('https://', adapter)
+    client.authenticate()
+    project_data = client.get_project_with_cases(1)
+    
+    discards.count = 0
+    started = time.perf_counter()
+    cases = client.get_all_cases_detailed(project_data, max_workers=workers)
+    elapsed = time.perf_counter() - started
+    
+    stats = client.connection_stats()
+    stats.update(cases=len(cases), seconds=elapsed, discarded=discards.count)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=1000, help='Количество тест-кейсов')
+    parser.add_argument('--latency', type=float, default=0.005, help='Задержка ответа сервера, с')
+    parser.add_argument('--workers', type=int, nargs='+', default=[16, 32, 64],
+                        help='Число воркеров (стандартный пул requests рассчитан на 10 соединений)')
+    args = parser.parse_args()
+    
+    logging.getLogger('main').setLevel(logging.WARNING)
+    # Предупреждения пула не печатаются, а считаются
+    discards = PoolFullCounter()
+    pool_logger = logging.getLogger('urllib3.connectionpool')
+    pool_logger.setLevel(logging.WARNING)
+    pool_logger.propagate = False
+    pool_logger.addHandler(discards)
+    
+    with FakeTMSServer(folders=10, cases_per_folder=max(1, args.cases // 10), latency=args.latency) as server:
+        print(f"{'workers':>8} {'pool':>8} {'requests':>9} {'new conns':>10} {'discarded':>10} "
+              f"{'reuse':>8} {'cases/s':>9}")
+        for workers in args.workers:
+            for sized_pool in (False, True):
+                stats = run(server.base_url, workers, sized_pool, discards)
+                pool = str(workers) if sized_pool else 'default'
+                print(f"{workers:>8} {pool:>8} {stats['requests']:>9} {stats['connections']:>10} "
+                      f"{stats['discarded']:>10} {stats['reuse_ratio'] * 100:>7.1f}% {stats['cases'] / stats['seconds']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
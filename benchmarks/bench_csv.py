@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк CSV: запись, разбор и сквозной экспорт/импорт
+
+Генерирует синтетический набор тест-кейсов (многострочный текст, кириллица,
+точки с запятой и кавычки, как в export.csv) и измеряет:
+    write  - CSVHandler.export_to_csv() из сгенерированных кейсов
+    parse  - CSVHandler.import_from_csv() полученного файла
+    export - `main.py export` против fake_server.py
+    import - `main.py import` того же файла в fake_server.py
+
+Для каждого этапа печатаются строки CSV/с, МБ/с и прирост пикового RSS. Каждый этап
+выполняется в отдельном процессе, чтобы пики памяти не смешивались. Результаты можно
+сохранить в JSON (--json) и сравнить с предыдущим запуском (--compare).
+
+Пример:
+    python benchmarks/bench_csv.py --cases 5000 --steps 10 --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+STAGES = ('write', 'parse', 'export', 'import')
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в МБ (ru_maxrss: КБ в Linux, байты в macOS)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def generate_cases(count: int, steps: int, folders: int = 10, seed: int = 0) -> Iterator[Dict]:
+    """
+    Генератор синтетических тест-кейсов в формате TMSClient.iter_cases_detailed
+    
+    Каждый пятый кейс - простой (template 0) с многострочными предусловиями,
+    остальные - пошаговые с steps шагами.
+    """
+    rng = random.Random(seed)
+    for case_id in range(1, count + 1):
+        folder_id = case_id % folders + 1
+        simple = case_id % 5 == 0 or steps == 0
+        yield {
+            'id': case_id,
+            'title': f'Проверка сценария {case_id}; вариант "{rng.choice(["А", "Б", "В"])}"',
+            'state': 0,
+            'priority': rng.randint(0, 3),
+            'type': rng.randint(0, 7),
+            'automationStatus': rng.randint(0, 1),
+            'description': 'Тестирование функциональности; первая строка\nвторая строка с "кавычками"',
+            'preConditions': 'Пользователь авторизован\nОткрыт раздел "Настройки"' if simple else '',
+            'expectedResults': 'Изменения сохранены; уведомление показано' if simple else '',
+            'template': 0 if simple else 1,
+            'Steps': [] if simple else [
+                {
+                    'step': f'Шаг {n}: открыть форму; заполнить поле "Имя"\nнажать «Сохранить»',
+                    'result': f'Результат {n}: ' + 'данные сохранены ' * rng.randint(1, 4),
+                    'caseSteps': {'stepNo': n},
+                }
+                for n in range(1, steps + 1)
+            ],
+            'folderId': folder_id,
+            'folderName': f'Папка {folder_id}',
+            'createdAt': '2024-01-01T00:00:00.000Z',
+            'updatedAt': '2024-01-01T00:00:00.000Z',
+        }
+
+
+def count_rows(cases: Iterable[Dict]) -> int:
+    """Количество строк данных CSV для тест-кейсов (по CSVHandler._case_to_rows, с многострочными предусловиями)"""
+    from main import CSVHandler
+    
+    return sum(sum(1 for _ in CSVHandler._case_to_rows(case)) for case in cases)
+
+
+def run_stage(stage: str, params: Dict) -> None:
+    """Выполнение одного этапа (в дочернем процессе), результат печатается в JSON"""
+    import main as tms
+    from main import CSVHandler
+    
+    logging.getLogger('main').setLevel(logging.WARNING)
+    file_path = params['file']
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    
+    if stage == 'write':
+        ok = CSVHandler.export_to_csv(generate_cases(params['cases'], params['steps']), file_path)
+    elif stage == 'parse':
+        cases_by_folder = CSVHandler.import_from_csv(file_path)
+        ok = sum(len(cases) for cases in cases_by_folder.values()) == params['cases']
+    else:
+        os.environ.update(TMS_BASE_URL=params['base_url'], TMS_EMAIL='bench@example.com', TMS_PASSWORD='bench')
+        argv = [stage, '--project-id', '1', '--workers', str(params['workers'])]
+        argv += ['--output', file_path] if stage == 'export' else ['--file', file_path]
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                ok = tms.main(argv) == tms.EXIT_OK
+            finally:
+                sys.stdout = stdout
+    
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'ok': ok,
+        'seconds': elapsed,
+        'baseline_rss_mb': baseline_mb,
+        'peak_rss_mb': peak_rss_mb(),
+        'file_mb': os.path.getsize(file_path) / (1024 * 1024),
+    }))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=5000, help='Количество тест-кейсов')
+    parser.add_argument('--steps', type=int, default=10, help='Количество шагов в пошаговых кейсах')
+    parser.add_argument('--workers', type=int, default=8, help='Количество воркеров для export/import')
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа fake-сервера, с')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--json', help='Сохранить результаты в JSON файл')
+    parser.add_argument('--compare', help='JSON файл предыдущего запуска для сравнения')
+    parser.add_argument('--child', nargs=2, metavar=('STAGE', 'PARAMS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_stage(args.child[0], json.loads(args.child[1]))
+        return
+    
+    from fake_server import FakeTMSServer
+    
+    rows = count_rows(generate_cases(args.cases, args.steps))
+    results = {}
+    folders = 10
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            FakeTMSServer(folders=folders, cases_per_folder=max(1, args.cases // folders), steps=args.steps,
+                          simple_ratio=0.2, latency=args.latency) as server:
+        # Количество строк выгрузки считается до импорта, который добавляет кейсы на сервер
+        export_rows = count_rows(server.data.cases.values())
+        params = {'cases': args.cases, 'steps': args.steps, 'workers': args.workers, 'base_url': server.base_url}
+        print(f"{'stage':>8} {'seconds':>9} {'rows/s':>10} {'MB/s':>8} {'growth MB':>10} {'CSV MB':>8}")
+        for stage in STAGES:
+            if stage not in args.stages:
+                continue
+            # write/parse работают с синтетическим файлом, export/import - с выгрузкой fake-сервера
+            params['file'] = os.path.join(tmp_dir, 'synthetic.csv' if stage in ('write', 'parse') else 'export.csv')
+            if stage == 'parse' and not os.path.exists(params['file']):
+                subprocess.run([sys.executable, __file__, '--child', 'write', json.dumps(params)],
+                               check=True, capture_output=True)
+            if stage == 'import' and not os.path.exists(params['file']):
+                subprocess.run([sys.executable, __file__, '--child', 'export', json.dumps(params)],
+                               check=True, capture_output=True, cwd=tmp_dir)
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', stage, json.dumps(params)],
+                check=True, capture_output=True, text=True, cwd=tmp_dir
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            stage_rows = rows if stage in ('write', 'parse') else export_rows
+            result.update(
+                rows=stage_rows,
+                rows_per_s=stage_rows / result['seconds'],
+                mb_per_s=result['file_mb'] / result['seconds'],
+                rss_growth_mb=result['peak_rss_mb'] - result['baseline_rss_mb'],
+            )
+            results[stage] = result
+            status = '' if result['ok'] else '  ❌'
+            print(f"{stage:>8} {result['seconds']:>9.2f} {result['rows_per_s']:>10.0f} {result['mb_per_s']:>8.1f} "
+                  f"{result['rss_growth_mb']:>10.1f} {result['file_mb']:>8.1f}{status}")
+    
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'params': {'cases': args.cases, 'steps': args.steps, 'workers': args.workers, 'latency': args.latency},
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результаты сохранены: {args.json}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"\nСравнение с {previous.get('revision') or args.compare}:")
+        print(f"{'stage':>8} {'rows/s':>10} {'было':>10} {'изм.':>8}")
+        for stage, result in results.items():
+            before = previous.get('results', {}).get(stage)
+            if not before:
+                continue
+            change = (result['rows_per_s'] / before['rows_per_s'] - 1) * 100
+            print(f"{stage:>8} {result['rows_per_s']:>10.0f} {before['rows_per_s']:>10.0f} {change:>+7.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк памяти при экспорте тест-кейсов в CSV
+
+Сравнивает пиковый RSS процесса для двух путей экспорта против локального
+fake_server.py:
+    list   - get_all_cases_detailed() + export_to_csv(список)
+    stream - iter_cases_detailed() + export_to_csv(генератор)
+
+Каждый путь выполняется в отдельном процессе, чтобы пики памяти не смешивались.
+
+Пример:
+    python benchmarks/bench_export_memory.py --cases 5000 --steps 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в МБ (ru_maxrss: КБ в Linux, байты в macOS)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def run_mode(mode: str, base_url: str, workers: int) -> None:
+    """Выполнение одного пути экспорта (в дочернем процессе)"""
+    from main import TMSClient, CSVHandler
+
+    logging.getLogger('main').setLevel(logging.WARNING)
+    client = TMSClient(base_url, 'bench@example.com', 'bench')
+    client.authenticate()
+    project_data = client.get_project_with_cases(1)
+    baseline_mb = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'export.csv')
+        started = time.perf_counter()
+        if mode == 'list':
+            cases = client.get_all_cases_detailed(project_data, workers)
+        else:
+            cases = client.iter_cases_detailed(project_data, workers)
+        CSVHandler.export_to_csv(cases, file_path)
+        elapsed = time.perf_counter() - started
+        file_mb = os.path.getsize(file_path) / (1024 * 1024)
+
+    print(json.dumps({
+        'mode': mode,
+        'seconds': elapsed,
+        'baseline_rss_mb': baseline_mb,
+        'peak_rss_mb': peak_rss_mb(),
+        'file_mb': file_mb,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=5000, help='Количество тест-кейсов')
+    parser.add_argument('--steps', type=int, default=20, help='Количество шагов в каждом кейсе')
+    parser.add_argument('--workers', type=int, default=8, help='Количество воркеров загрузки')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'BASE_URL'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args.child[0], args.child[1], args.workers)
+        return
+
+    from fake_server import FakeTMSServer
+
+    folders = 10
+    with FakeTMSServer(folders=folders, cases_per_folder=max(1, args.cases // folders),
+                       steps=args.steps, latency=0) as server:
+        print(f"{'mode':>8} {'seconds':>9} {'baseline MB':>12} {'peak RSS MB':>12} {'growth MB':>10} {'CSV MB':>8}")
+        for mode in ('list', 'stream'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--workers', str(args.workers), '--child', mode, server.base_url],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            growth = result['peak_rss_mb'] - result['baseline_rss_mb']
+            print(f"{mode:>8} {result['seconds']:>9.2f} {result['baseline_rss_mb']:>12.1f} "
+                  f"{result['peak_rss_mb']:>12.1f} {growth:>10.1f} {result['file_mb']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк параллельной загрузки деталей тест-кейсов
+
+Запускает TMSClient.get_all_cases_detailed против локального fake_server.py
+с разным числом воркеров и печатает пропускную способность (кейсов/с).
+
+Пример:
+    python benchmarks/bench_export_workers.py --cases 500 --latency 0.02 --workers 1 2 4 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import TMSClient  # noqa: E402
+from fake_server import FakeTMSServer  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=500, help='Количество тест-кейсов')
+    parser.add_argument('--folders', type=int, default=10, help='Количество папок')
+    parser.add_argument('--latency', type=float, default=0.02, help='Задержка ответа сервера, с')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    logging.getLogger('main').setLevel(logging.WARNING)
+
+    with FakeTMSServer(folders=args.folders, cases_per_folder=max(1, args.cases // args.folders),
+                       latency=args.latency) as server:
+        client = TMSClient(server.base_url, 'bench@example.com', 'bench')
+        client.authenticate()
+        project_data = client.get_project_with_cases(1)
+        expected_ids = [case['id'] for folder in project_data['Folders'] for case in folder['Cases']]
+
+        print(f"{'workers':>8} {'cases':>8} {'seconds':>10} {'cases/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            cases = client.get_all_cases_detailed(project_data, max_workers=workers)
+            elapsed = time.perf_counter() - started
+
+            if [case['id'] for case in cases] != expected_ids:
+                raise SystemExit(f'Нарушен порядок кейсов при workers={workers}')
+
+            throughput = len(cases) / elapsed
+            baseline = baseline or throughput
+            print(f'{workers:>8} {len(cases):>8} {elapsed:>10.2f} {throughput:>10.1f} {throughput / baseline:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Fake unitTCMS - локальный сервер-заглушка TMS API для бенчмарков и офлайн-проверок
+
+Реализует endpoint'ы, которые использует TMSClient:
+    POST /users/signin, GET /projects, GET /home/{projectId},
+    GET/POST /folders, GET /folders/{folderId},
+    GET /cases/{caseId}, POST /cases, POST /steps/update
+
+Данные генерируются в памяти. Задержка ответов, доля ошибок 5xx, доля ответов 429
+с Retry-After и время жизни токена настраиваются, что позволяет проверять повторы,
+адаптивное ограничение нагрузки и обновление токена без доступа к настоящему TMS.
+
+Пример:
+    python fake_server.py --port 8080 --cases 5000 --steps 5 --latency 0.02 --rate-429 0.01
+    TMS_BASE_URL=http://127.0.0.1:8080 TMS_EMAIL=a TMS_PASSWORD=b python main.py export --project-id 1
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Поля тест-кейса без шагов, которые отдаются в списке /home/{projectId}
+CASE_FIELDS = [
+    'id', 'title', 'state', 'priority', 'type', 'automationStatus', 'description',
+    'template', 'preConditions', 'expectedResults', 'folderId', 'createdAt', 'updatedAt'
+]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class FakeTMSData:
+    """Хранилище проектов, папок, тест-кейсов и шагов"""
+    
+    def __init__(self, projects: int = 1, folders: int = 10, cases_per_folder: int = 50, steps: int = 3,
+                 simple_ratio: float = 0.0, depth: int = 1, seed: int = 0):
+        self.lock = threading.Lock()
+        self.projects = {}
+        self.folders = {}
+        self.cases = {}
+        self._next_ids = {'folder': 1, 'case': 1, 'step': 1}
+        rng = random.Random(seed)
+        
+        for project_id in range(1, projects + 1):
+            self.projects[project_id] = {
+                'id': project_id,
+                'name': f'Проект {project_id}',
+                'detail': 'Сгенерирован fake_server.py',
+                'isPublic': False,
+                'createdAt': _now(),
+            }
+            parent_id = None
+            for folder_no in range(1, folders + 1):
+                # Папки образуют цепочки вложенности глубиной depth
+                if (folder_no - 1) % max(1, depth) == 0:
+                    parent_id = None
+                folder = self.create_folder(project_id, f'Папка {folder_no}', '', parent_id)
+                parent_id = folder['id']
+                for _ in range(cases_per_folder):
+                    simple = rng.random() < simple_ratio or steps == 0
+                    case = self.create_case(folder['id'], {
+                        'title': f'Тест-кейс {self._next_ids["case"]}: проверка; "кавычки"',
+                        'state': 0,
+                        'priority': rng.randint(0, 3),
+                        'type': rng.randint(0, 7),
+                        'automationStatus': rng.randint(0, 1),
+                        'description': 'Описание тест-кейса\nсо второй строкой',
+                        'template': 0 if simple else 1,
+                        'preConditions': 'Пользователь авторизован\nОткрыта главная страница' if simple else '',
+                        'expectedResults': 'Ожидаемый результат' if simple else '',
+                    })
+                    if not simple:
+                        self.update_steps(case['id'], [
+                            {'step': f'Шаг {n}; ' + 'действие ' * 20, 'result': 'Ожидаемый результат ' * 10,
+                             'caseSteps': {'stepNo': n}}
+                            for n in range(1, steps + 1)
+                        ])
+    
+    def _next_id(self, kind: str) -> int:
+        value = self._next_ids[kind]
+        self._next_ids[kind] += 1
+        return value
+    
+    def create_folder(self, project_id: int, name: str, detail: str, parent_id: Optional[int]) -> Dict:
+        with self.lock:
+            folder = {
+                'id': self._next_id('folder'),
+                'name': name,
+                'detail': detail,
+                'projectId': project_id,
+                'parentFolderId': parent_id,
+                'createdAt': _now(),
+                'updatedAt': _now(),
+            }
+            self.folders[folder['id']] = folder
+            return dict(folder)
+    
+    def create_case(self, folder_id: int, data: Dict) -> Dict:
+        with self.lock:
+            case = {field: data.get(field, '') for field in CASE_FIELDS}
+            case.update(id=self._next_id('case'), folderId=folder_id, createdAt=_now(), updatedAt=_now(), Steps=[])
+            self.cases[case['id']] = case
+            return {field: case[field] for field in CASE_FIELDS}
+    
+    def update_steps(self, case_id: int, steps: List[Dict]) -> List[Dict]:
+        with self.lock:
+            case = self.cases[case_id]
+            case['Steps'] = [
+                {
+                    'id': self._next_id('step'),
+                    'step': step.get('step', ''),
+                    'result': step.get('result', ''),
+                    'caseSteps': {'stepNo': step.get('caseSteps', {}).get('stepNo', n)},
+                }
+                for n, step in enumerate(steps, 1)
+            ]
+            case['updatedAt'] = _now()
+            return case['Steps']
+    
+    def home(self, project_id: int) -> Dict:
+        with self.lock:
+            project = dict(self.projects[project_id])
+            folders = []
+            for folder in self.folders.values():
+                if folder['projectId'] != project_id:
+                    continue
+                cases = [
+                    {field: case[field] for field in CASE_FIELDS}
+                    for case in self.cases.values() if case['folderId'] == folder['id']
+                ]
+                folders.append(dict(folder, Cases=cases))
+            project['Folders'] = folders
+            return project
+
+
+class FakeTMSServer:
+    """
+    Fake TMS сервер в фоновом потоке
+    
+    Пример:
+        with FakeTMSServer(cases_per_folder=100, latency=0.01) as server:
+            client = TMSClient(server.base_url, 'user@example.com', 'secret')
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, projects: int = 1, folders: int = 10,
+                 cases_per_folder: int = 50, steps: int = 3, simple_ratio: float = 0.0, depth: int = 1, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, rate_429: float = 0.0, retry_after: float = 1.0,
+                 token_ttl: Optional[float] = None, seed: int = 0):
+        self.data = FakeTMSData(projects, folders, cases_per_folder, steps, simple_ratio, depth, seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.tokens = {}
+        self.stats = {'requests': 0, 'errors': 0, 'throttled': 0, 'unauthorized': 0}
+        self._rng = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def _fault(self) -> Optional[Tuple[int, Dict]]:
+        """Случайная ошибка 5xx или 429 согласно настройкам"""
+        with self._stats_lock:
+            roll = self._rng.random()
+        if roll < self.rate_429:
+            self._count('throttled')
+            return 429, {'Retry-After': f'{self.retry_after:g}'}
+        if roll < self.rate_429 + self.error_rate:
+            self._count('errors')
+            return 503 if roll < self.rate_429 + self.error_rate / 2 else 502, {}
+        return None
+    
+    def _token_valid(self, header: Optional[str]) -> bool:
+        token = (header or '').replace('Bearer ', '', 1)
+        issued_at = self.tokens.get(token)
+        if issued_at is None:
+            return False
+        return self.token_ttl is None or time.monotonic() - issued_at < self.token_ttl
+    
+    def handle(self, method: str, path: str, headers, payload) -> Tuple[int, object, Dict]:
+        """Обработка запроса: (статус, тело ответа, дополнительные заголовки)"""
+        self._count('requests')
+        url = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        
+        if method == 'POST' and url.path == '/users/signin':
+            token = uuid.uuid4().hex
+            self.tokens[token] = time.monotonic()
+            return 200, {'access_token': token}, {}
+        
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        if not self._token_valid(headers.get('Authorization')):
+            self._count('unauthorized')
+            return 401, {'error': 'Unauthorized'}, {}
+        fault = self._fault()
+        if fault:
+            return fault[0], {'error': 'Injected failure'}, fault[1]
+        
+        data = self.data
+        match = re.fullmatch(r'/(\w+)(?:/(\d+))?', url.path)
+        resource, item_id = (match.group(1), int(match.group(2)) if match.group(2) else None) if match else ('', None)
+        
+        if method == 'GET' and resource == 'projects':
+            return 200, list(data.projects.values()), {}
+        if method == 'GET' and resource == 'home' and item_id in data.projects:
+            return 200, data.home(item_id), {}
+        if method == 'GET' and resource == 'folders' and item_id is None:
+            project_id = int(query.get('projectId', 0))
+            return 200, [f for f in data.folders.values() if f['projectId'] == project_id], {}
+        if method == 'GET' and resource == 'folders' and item_id in data.folders:
+            return 200, data.folders[item_id], {}
+        if method == 'POST' and resource == 'folders' and int(query.get('projectId', 0)) in data.projects:
+            payload = payload or {}
+            folder = data.create_folder(int(query['projectId']), payload.get('name', ''),
+                                        payload.get('detail', ''), payload.get('parentFolderId'))
+            return 200, folder, {}
+        if method == 'GET' and resource == 'cases' and item_id in data.cases:
+            with data.lock:
+                return 200, json.loads(json.dumps(data.cases[item_id])), {}
+        if method == 'POST' and resource == 'cases' and int(query.get('folderId', 0)) in data.folders:
+            return 200, data.create_case(int(query['folderId']), payload or {}), {}
+        if method == 'POST' and url.path == '/steps/update' and int(query.get('caseId', 0)) in data.cases:
+            return 200, data.update_steps(int(query['caseId']), payload or []), {}
+        return 404, {'error': 'Not found'}, {}
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки и тело уходят одним пакетом (без задержек Nagle/delayed ACK)
+            wbufsize = 64 * 1024
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _dispatch(self, method: str) -> None:
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    payload = json.loads(raw) if raw else None
+                except ValueError:
+                    payload = None
+                status, body, extra_headers = server.handle(method, self.path, self.headers, payload)
+                encoded = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(encoded)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+            
+            def do_GET(self):
+                self._dispatch('GET')
+            
+            def do_POST(self):
+                self._dispatch('POST')
+        
+        return Handler
+    
+    def start(self) -> 'FakeTMSServer':
+        self.thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self) -> 'FakeTMSServer':
+        return self.start()
+    
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--projects', type=int, default=1, help='Количество проектов')
+    parser.add_argument('--folders', type=int, default=10, help='Папок в каждом проекте')
+    parser.add_argument('--cases', type=int, default=500, help='Тест-кейсов в каждом проекте')
+    parser.add_argument('--steps', type=int, default=3, help='Шагов в пошаговых тест-кейсах')
+    parser.add_argument('--simple-ratio', type=float, default=0.0, help='Доля простых тест-кейсов без шагов')
+    parser.add_argument('--depth', type=int, default=1, help='Глубина вложенности папок')
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа, с')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Случайный разброс задержки, с')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 502/503')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Доля ответов 429 с Retry-After')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Значение Retry-After для 429, с')
+    parser.add_argument('--token-ttl', type=float, help='Время жизни токена, с (по умолчанию бессрочно)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed генератора данных и ошибок')
+    args = parser.parse_args()
+    
+    server = FakeTMSServer(
+        host=args.host, port=args.port, projects=args.projects, folders=args.folders,
+        cases_per_folder=max(1, args.cases // max(1, args.folders)), steps=args.steps,
+        simple_ratio=args.simple_ratio, depth=args.depth, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_429=args.rate_429, retry_after=args.retry_after, token_ttl=args.token_ttl, seed=args.seed
+    )
+    print(f'Fake TMS API: {server.base_url} '
+          f'({len(server.data.projects)} проектов, {len(server.data.cases)} тест-кейсов)')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,10 +11,18 @@ import os
 import sys
 import json
 import csv
+import hashlib
+import random
+import re
+import threading
+import time
 import requests
-from typing import Dict, List, Optional, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 import logging
 from pathlib import Path
 
@@ -29,6 +37,254 @@ logger = logging.getLogger(__name__)
 from dotenv import load_dotenv
 load_dotenv()
 
+# Коды завершения для неинтерактивного режима
+EXIT_OK = 0             # Успешное выполнение
+EXIT_ERROR = 1          # Ошибка выполнения
+EXIT_USAGE = 2          # Неверные аргументы командной строки
+EXIT_CONNECTION = 3     # Не заданы параметры подключения или не удалась аутентификация
+EXIT_NOT_FOUND = 4      # Проект, файл или папка не найдены
+EXIT_PARTIAL = 5        # Выполнено, но часть тест-кейсов обработать не удалось
+EXIT_INTERRUPTED = 130  # Прервано пользователем
+
+def env_int(name: str, default: int) -> int:
+    """Чтение целого числа из переменной окружения с значением по умолчанию"""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"⚠️ Некорректное значение {name}={value!r}, используется {default}")
+        return default
+
+def env_float(name: str, default: float) -> float:
+    """Чтение дробного числа из переменной окружения с значением по умолчанию"""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"⚠️ Некорректное значение {name}={value!r}, используется {default}")
+        return default
+
+def ordered_parallel_map(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 1) -> Iterator[Any]:
+    """
+    Параллельное применение func к элементам с сохранением исходного порядка результатов
+    
+    Одновременно выполняется не более max_workers вызовов. Вперед из items забирается
+    не более 2 * max_workers элементов, поэтому items может быть ленивым генератором.
+    
+    Args:
+        func: Функция, применяемая к каждому элементу
+        items: Входные элементы
+        max_workers: Максимальное число одновременных вызовов (1 - последовательно)
+        
+    Returns:
+        Итератор результатов в порядке входных элементов
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# Расширения файлов с потоковым сжатием и соответствующие кодеки
+COMPRESSED_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+def file_compression(file_path: str) -> Optional[str]:
+    """Кодек сжатия файла по расширению: 'gzip', 'zstd' или None"""
+    return COMPRESSED_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+def open_text_file(file_path: str, mode: str = 'r', encoding: str = 'utf-8', newline: Optional[str] = None):
+    """
+    Открытие текстового файла с потоковым сжатием или распаковкой по расширению
+    
+    Файлы .gz читаются и пишутся через gzip, .zst - через пакет zstandard (опционально),
+    остальные - как обычные файлы. Данные сжимаются и распаковываются по мере чтения
+    и записи, несжатая копия файла не создается.
+    """
+    compression = file_compression(file_path)
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(file_path, mode + 't', compresslevel=6, encoding=encoding, newline=newline)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Для файлов .zst требуется пакет zstandard: pip install zstandard")
+        return zstandard.open(file_path, mode + 't', encoding=encoding, newline=newline)
+    return open(file_path, mode, encoding=encoding, newline=newline)
+
+def write_journaled_file(test_cases: Iterable[Dict], file_path: str, journal: Optional['ExportJournal'],
+                         make_writer: Callable[[Any], Callable[[Dict], None]],
+                         write_header: Optional[Callable[[Any], None]] = None,
+                         encoding: str = 'utf-8', newline: Optional[str] = None) -> int:
+    """
+    Потоковая запись тест-кейсов в текстовый файл с контрольными точками журнала экспорта
+    
+    Если в журнале уже есть записанные кейсы, файл обрезается до последней контрольной
+    точки и дописывается, иначе создается заново (с заголовком write_header). После
+    каждого кейса позиция файла сохраняется в журнал. Для сжатых файлов позиции
+    не ведутся (в журнале лишь отмечаются кейсы), поэтому продолжение невозможно.
+    
+    Args:
+        test_cases: Тест-кейсы для записи (может быть генератором)
+        file_path: Путь к файлу (.gz и .zst сжимаются, см. open_text_file)
+        journal: Журнал экспорта или None
+        make_writer: Фабрика функции записи одного тест-кейса в открытый файл
+        write_header: Запись заголовка в новый файл
+        
+    Returns:
+        Количество записанных тест-кейсов
+        
+    Raises:
+        ValueError: если требуется продолжить экспорт в сжатый файл
+    """
+    exported_count = 0
+    resume = journal is not None and bool(journal.done_ids)
+    compressed = file_compression(file_path) is not None
+    
+    if resume and compressed:
+        raise ValueError(f"продолжение экспорта в сжатый файл не поддерживается: {file_path}")
+    
+    if resume:
+        # Отбрасываем запись кейса, который мог быть записан не полностью
+        with open(file_path, 'r+b') as partial_file:
+            partial_file.truncate(journal.offset)
+    
+    with open_text_file(file_path, 'a' if resume else 'w', encoding=encoding, newline=newline) as output_file:
+        write_case = make_writer(output_file)
+        
+        if not resume:
+            if write_header:
+                write_header(output_file)
+            if journal is not None and not compressed:
+                output_file.flush()
+                journal.start(file_path, output_file.tell())
+        
+        for case in test_cases:
+            write_case(case)
+            exported_count += 1
+            
+            if journal is not None and compressed:
+                journal.mark_done(case['id'])
+            elif journal is not None:
+                # Контрольная точка: кейс полностью записан на диск
+                output_file.flush()
+                journal.record(case['id'], output_file.tell())
+    
+    return exported_count
+
+# Форматы файлов экспорта и импорта
+FILE_FORMATS = ('csv', 'jsonl', 'sqlite')
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.sqlite': 'sqlite', '.sqlite3': 'sqlite', '.db': 'sqlite'
+}
+
+def data_file_extension(file_path: str) -> str:
+    """Расширение файла данных вместе со сжатием ('.csv', '.jsonl.gz', ...) или ''"""
+    name = os.path.basename(file_path).lower()
+    compression = file_compression(name)
+    if compression:
+        name = os.path.splitext(name)[0]
+    extension = os.path.splitext(name)[1]
+    if extension not in FORMAT_EXTENSIONS:
+        return ''
+    return os.path.basename(file_path)[len(name) - len(extension):]
+
+def detect_file_format(file_path: str) -> str:
+    """Формат файла по расширению (в т.ч. сжатого): 'jsonl', 'sqlite' или 'csv' по умолчанию"""
+    extension = data_file_extension(file_path).lower()
+    return FORMAT_EXTENSIONS.get('.' + extension.split('.')[1], 'csv') if extension else 'csv'
+
+def group_cases_by_folder(pairs: Iterable[tuple[str, Dict]], file_path: str) -> Dict[str, List[Dict]]:
+    """Группировка пар (ключ папки, тест-кейс) из файла импорта по папкам"""
+    cases_by_folder = {}
+    
+    for folder_key, test_case in pairs:
+        if folder_key not in cases_by_folder:
+            cases_by_folder[folder_key] = []
+        cases_by_folder[folder_key].append(test_case)
+    
+    total_cases = sum(len(cases) for cases in cases_by_folder.values())
+    logger.info(f"✓ Загружено {total_cases} тест-кейсов из {file_path}")
+    logger.info(f"ℹ️ Распределение по папкам: {dict((k, len(v)) for k, v in cases_by_folder.items())}")
+    
+    return cases_by_folder
+
+# Поля тест-кейса, из которых строится CSV (кроме папки, которую добавляет клиент)
+CASE_CSV_FIELDS = (
+    'id', 'title', 'state', 'priority', 'type', 'automationStatus', 'description',
+    'preConditions', 'expectedResults', 'template', 'createdAt', 'updatedAt'
+)
+
+def listing_has_case_details(case: Dict) -> bool:
+    """
+    Достаточно ли данных кейса из списка /home/{projectId} для экспорта в CSV
+    
+    Простые кейсы (template != 1) не имеют шагов, и запрос /cases/{caseId} для них
+    не нужен, если список уже содержит все колонки CSV. Пошаговые кейсы загружаются
+    отдельно, если в списке нет их шагов.
+    """
+    if not all(field in case for field in CASE_CSV_FIELDS):
+        return False
+    return case['template'] != 1 or 'Steps' in case
+
+def folder_path_names(folders_by_id: Dict[int, Dict], folder: Dict) -> tuple:
+    """Путь папки от корня проекта в виде кортежа имен (по parentFolderId)"""
+    path = [folder['name']]
+    seen = {folder['id']}
+    parent = folders_by_id.get(folder.get('parentFolderId'))
+    while parent and parent['id'] not in seen:
+        path.append(parent['name'])
+        seen.add(parent['id'])
+        parent = folders_by_id.get(parent.get('parentFolderId'))
+    return tuple(reversed(path))
+
+def join_folder_path(names: Iterable[str]) -> str:
+    """
+    Путь папки для CSV: имена через '/', символы '/' и '\\' в именах экранируются
+    
+    Пример: ('Auth', 'Login/SSO') -> 'Auth/Login\\/SSO'
+    """
+    return '/'.join(name.replace('\\', '\\\\').replace('/', '\\/') for name in names)
+
+def split_folder_path(path: str) -> List[str]:
+    """Разбор пути папки из CSV на имена (обратная операция к join_folder_path)"""
+    names = []
+    current = []
+    escaped = False
+    for char in path:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '/':
+            names.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    names.append(''.join(current).strip())
+    return [name for name in names if name]
+
+def project_folder_paths(project_data: Dict) -> Dict[int, str]:
+    """Пути всех папок проекта из /home/{projectId} для колонки folder_name"""
+    folders_by_id = {folder['id']: folder for folder in project_data.get('Folders', [])}
+    return {
+        folder_id: join_folder_path(folder_path_names(folders_by_id, folder))
+        for folder_id, folder in folders_by_id.items()
+    }
+
 @dataclass
 class TestCaseRow:
     """Структура строки тест-кейса для CSV (одна строка может быть шагом или основной информацией)"""
@@ -49,16 +305,377 @@ class TestCaseRow:
     created_at: str = ""
     updated_at: str = ""
 
+@dataclass
+class RetryPolicy:
+    """Политика повторов запросов к TMS API"""
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_statuses: tuple = (429, 500, 502, 503, 504)
+    
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Задержка перед повтором
+        
+        Args:
+            attempt: Номер неудачной попытки (с 0)
+            retry_after: Значение заголовка Retry-After в секундах, если сервер его прислал
+            
+        Returns:
+            Задержка в секундах: Retry-After либо экспоненциальная с полным jitter
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Разбор заголовка Retry-After (секунды или HTTP-дата)"""
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return (retry_at - datetime.now(retry_at.tzinfo)).total_seconds()
+
+class AdaptiveLimiter:
+    """
+    Адаптивный ограничитель числа одновременных запросов (AIMD)
+    
+    Каждый успешный запрос увеличивает лимит на 1/limit (примерно +1 за "окно"
+    запросов), сигнал перегрузки сервера (429, 503, таймаут) уменьшает его вдвое,
+    но не чаще раза в DECREASE_INTERVAL секунд, чтобы пачка одновременных отказов
+    не обрушила лимит до минимума.
+    """
+    
+    DECREASE_INTERVAL = 1.0
+    
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+    
+    def acquire(self) -> None:
+        """Ожидание свободного слота"""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+    
+    def release(self, overloaded: bool = False) -> None:
+        """Освобождение слота с учетом того, сигнализировал ли сервер о перегрузке"""
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= self.DECREASE_INTERVAL:
+                    self.limit = max(float(self.min_limit), self.limit / 2)
+                    self._last_decrease = now
+                    logger.warning(f"⚠️ Сервер перегружен, одновременных запросов не более {int(self.limit)}")
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class ClientMetrics:
+    """
+    Метрики запросов к TMS API по шаблонам endpoint'ов
+    
+    Для каждого шаблона (например, "GET /cases/{id}") накапливаются количество
+    HTTP запросов, повторов и ошибок, объем переданных данных и задержки,
+    по которым считаются перцентили p50/p95/p99.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        """Сброс накопленных метрик (в начале нового экспорта или импорта)"""
+        with self._lock:
+            self.endpoints = {}
+            self.started_at = time.time()
+    
+    @staticmethod
+    def endpoint_template(method: str, path: str) -> str:
+        """Шаблон endpoint'а: числовые сегменты пути и параметров заменяются плейсхолдерами"""
+        path, _, query = path.partition('?')
+        path = re.sub(r'/\d+(?=/|$)', '/{id}', path)
+        if query:
+            query = re.sub(r'(\w+)=\d+', r'\1={\1}', query)
+            path = f"{path}?{query}"
+        return f"{method.upper()} {path}"
+    
+    def _entry(self, endpoint: str) -> Dict:
+        return self.endpoints.setdefault(endpoint, {
+            'requests': 0, 'retries': 0, 'errors': 0, 'bytes_sent': 0, 'bytes_received': 0, 'latencies': []
+        })
+    
+    def record_request(self, endpoint: str, latency: float, bytes_sent: int = 0, bytes_received: int = 0) -> None:
+        """Учет одного HTTP запроса (попытки)"""
+        with self._lock:
+            entry = self._entry(endpoint)
+            entry['requests'] += 1
+            entry['bytes_sent'] += bytes_sent
+            entry['bytes_received'] += bytes_received
+            entry['latencies'].append(latency)
+    
+    def record_retry(self, endpoint: str) -> None:
+        """Учет повтора запроса"""
+        with self._lock:
+            self._entry(endpoint)['retries'] += 1
+    
+    def record_error(self, endpoint: str) -> None:
+        """Учет окончательно неудачного запроса"""
+        with self._lock:
+            self._entry(endpoint)['errors'] += 1
+    
+    @staticmethod
+    def _percentile(sorted_values: List[float], percent: float) -> float:
+        if not sorted_values:
+            return 0.0
+        index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values) + 0.5)) - 1))
+        return sorted_values[index]
+    
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Сводка по endpoint'ам
+        
+        Returns:
+            Словарь шаблон endpoint'а -> счетчики, байты и задержки p50/p95/p99 в миллисекундах
+        """
+        with self._lock:
+            result = {}
+            for endpoint, entry in sorted(self.endpoints.items()):
+                latencies = sorted(entry['latencies'])
+                result[endpoint] = {
+                    'requests': entry['requests'],
+                    'retries': entry['retries'],
+                    'errors': entry['errors'],
+                    'bytes_sent': entry['bytes_sent'],
+                    'bytes_received': entry['bytes_received'],
+                    'p50_ms': self._percentile(latencies, 50) * 1000,
+                    'p95_ms': self._percentile(latencies, 95) * 1000,
+                    'p99_ms': self._percentile(latencies, 99) * 1000,
+                }
+            return result
+    
+    def format_table(self) -> str:
+        """Сводка по endpoint'ам в виде текстовой таблицы"""
+        lines = [
+            f"{'Endpoint':<40} {'Запросов':>9} {'Повторов':>9} {'Ошибок':>7} {'Получено':>10} "
+            f"{'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8}"
+        ]
+        for endpoint, stats in self.summary().items():
+            lines.append(
+                f"{endpoint:<40} {stats['requests']:>9} {stats['retries']:>9} {stats['errors']:>7} "
+                f"{stats['bytes_received'] / (1024 * 1024):>7.1f} MB "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+            )
+        return "\n".join(lines)
+    
+    def write_json(self, file_path: str, extra: Optional[Dict] = None) -> None:
+        """Сохранение сводки в JSON файл для сравнения между запусками"""
+        data = {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration_s': time.time() - self.started_at,
+            'endpoints': self.summary(),
+        }
+        data.update(extra or {})
+        with open(file_path, 'w', encoding='utf-8') as metrics_file:
+            json.dump(data, metrics_file, ensure_ascii=False, indent=2)
+
 class TMSClient:
     """Клиент для работы с TMS API"""
     
-    def __init__(self, base_url: str, email: str, password: str):
+    # Статусы, при которых сервер гарантированно не обработал запрос и POST можно повторить
+    SAFE_RETRY_STATUSES = (429, 503)
+    
+    def __init__(self, base_url: str, email: str, password: str, max_concurrency: int = 100,
+                 retry_policy: Optional[RetryPolicy] = None, timeout: tuple = (10.0, 60.0),
+                 pool_size: Optional[int] = None):
+        """
+        Args:
+            base_url: Базовый URL API
+            email: Email пользователя
+            password: Пароль пользователя
+            max_concurrency: Максимальное число одновременных запросов
+            retry_policy: Политика повторов при временных ошибках
+            timeout: Таймауты (подключение, чтение) в секундах
+            pool_size: Размер пула keep-alive соединений (по умолчанию равен max_concurrency)
+        """
         self.base_url = base_url.rstrip('/')
         self.email = email
         self.password = password
         self.token = None
+        self.timeout = timeout
+        self._auth_lock = threading.Lock()
         self.session = requests.Session()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = AdaptiveLimiter(max_concurrency)
+        self.metrics = ClientMetrics()
+        self._connection_baseline = (0, 0)
+        
+        # Пул соединений по числу воркеров: каждый поток переиспользует свое соединение,
+        # а при нехватке ждет свободное вместо открытия и закрытия лишних
+        pool_size = pool_size or max_concurrency
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+    def _send(self, method: str, url: str, allow_reauth: bool = True, **kwargs) -> requests.Response:
+        """
+        Отправка запроса с повторами и адаптивным ограничением параллелизма
+        
+        Временные ошибки (обрыв соединения, таймаут, 429, 5xx) повторяются с
+        экспоненциальной задержкой или по заголовку Retry-After. POST запросы
+        повторяются только если сервер точно их не обработал, чтобы не создать дубликат.
+        При ответе 401 токен обновляется (один раз на все потоки) и запрос повторяется.
+        
+        Args:
+            method: HTTP метод
+            url: Полный URL запроса
+            allow_reauth: Обновлять ли токен при ответе 401 (False для самого входа)
+            
+        Returns:
+            Последний полученный ответ (в том числе с кодом ошибки)
+            
+        Raises:
+            requests.exceptions.RequestException: если соединение не удалось после всех попыток
+        """
+        policy = self.retry_policy
+        idempotent = method.upper() in ('GET', 'HEAD', 'OPTIONS')
+        timeout = kwargs.pop('timeout', self.timeout)
+        endpoint = self.metrics.endpoint_template(method, url[len(self.base_url):])
+        reauthenticated = False
+        attempt = 0
+        
+        while True:
+            last_attempt = attempt >= policy.max_retries
+            overloaded = False
+            token = self.token
+            response = None
+            self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+                overloaded = response.status_code in self.SAFE_RETRY_STATUSES
+                self.metrics.record_request(
+                    endpoint, time.perf_counter() - started,
+                    len(response.request.body or b''), len(response.content)
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.metrics.record_request(endpoint, time.perf_counter() - started)
+                overloaded = isinstance(e, requests.exceptions.Timeout)
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if last_attempt or not retryable:
+                    self.metrics.record_error(endpoint)
+                    raise
+                delay = policy.backoff(attempt)
+                logger.warning(f"⚠️ {method} {url}: {e}. Повтор {attempt + 1}/{policy.max_retries} через {delay:.1f} с")
+                self.metrics.record_retry(endpoint)
+            finally:
+                self.limiter.release(overloaded)
+            
+            # Ждем повтора после ошибки соединения уже без занятого слота лимитера
+            if response is None:
+                time.sleep(delay)
+                attempt += 1
+                continue
+            
+            # Истекший токен: обновляем его и повторяем запрос (не считается попыткой)
+            if response.status_code == 401 and allow_reauth and token and not reauthenticated:
+                reauthenticated = True
+                if self._reauthenticate(token):
+                    self.metrics.record_retry(endpoint)
+                    continue
+            
+            retryable = idempotent or response.status_code in self.SAFE_RETRY_STATUSES
+            if response.status_code not in policy.retry_statuses or not retryable or last_attempt:
+                if response.status_code >= 400:
+                    self.metrics.record_error(endpoint)
+                return response
+            
+            delay = policy.backoff(attempt, policy.parse_retry_after(response.headers.get('Retry-After')))
+            logger.warning(f"⚠️ {method} {url}: HTTP {response.status_code}. "
+                           f"Повтор {attempt + 1}/{policy.max_retries} через {delay:.1f} с")
+            self.metrics.record_retry(endpoint)
+            time.sleep(delay)
+            attempt += 1
+    
+    def _reauthenticate(self, stale_token: str) -> bool:
+        """
+        Повторная аутентификация после ответа 401
+        
+        Выполняется не более одного раза на все потоки: если пока поток ждал блокировку,
+        токен уже обновил другой поток, повторный вход не выполняется.
+        
+        Args:
+            stale_token: Токен, с которым запрос получил 401
+            
+        Returns:
+            True если запрос можно повторить с новым токеном
+        """
+        with self._auth_lock:
+            if self.token != stale_token:
+                return bool(self.token)
+            logger.warning("⚠️ Токен доступа отклонен (HTTP 401), выполняется повторная аутентификация")
+            return self.authenticate()
+    
+    def _pool_counters(self) -> tuple:
+        """Счетчики пулов urllib3 за все время жизни сессии: (запросы, открытые соединения)"""
+        requests_count = 0
+        connections_count = 0
+        for adapter in {id(adapter): adapter for adapter in self.session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    requests_count += pool.num_requests
+                    connections_count += pool.num_connections
+        return requests_count, connections_count
+    
+    def reset_stats(self) -> None:
+        """
+        Сброс метрик запросов и статистики соединений (в начале нового экспорта или импорта)
+        
+        Счетчики пулов urllib3 не сбрасываются, поэтому запоминается их текущее значение,
+        и connection_stats возвращает разницу с ним.
+        """
+        self.metrics.reset()
+        self._connection_baseline = self._pool_counters()
+    
+    def connection_stats(self) -> Dict[str, float]:
+        """
+        Статистика переиспользования keep-alive соединений с последнего reset_stats
         
+        Returns:
+            Словарь с количеством запросов, открытых соединений и долей запросов,
+            выполненных через уже открытое соединение
+        """
+        requests_count, connections_count = self._pool_counters()
+        requests_count -= self._connection_baseline[0]
+        connections_count -= self._connection_baseline[1]
+        reuse_ratio = 1 - connections_count / requests_count if requests_count else 0.0
+        return {'requests': requests_count, 'connections': connections_count, 'reuse_ratio': reuse_ratio}
+    
+    def _request(self, method: str, url: str, error_message: str, default: Any = None, **kwargs) -> Any:
+        """Выполнение запроса и разбор JSON ответа с логированием ошибки"""
+        try:
+            response = self._send(method, url, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ {error_message}: {e}")
+            return default
+    
     def authenticate(self) -> bool:
         """Аутентификация в системе"""
         try:
@@ -68,7 +685,7 @@ class TMSClient:
                 "password": self.password
             }
             
-            response = self.session.post(url, json=data)
+            response = self._send('POST', url, allow_reauth=False, json=data)
             response.raise_for_status()
             
             auth_data = response.json()
@@ -91,105 +708,107 @@ class TMSClient:
     
     def get_projects(self) -> List[Dict]:
         """Получение списка проектов пользователя"""
-        try:
-            url = f"{self.base_url}/projects?onlyUserProjects=true"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка получения проектов: {e}")
-            return []
+        url = f"{self.base_url}/projects?onlyUserProjects=true"
+        return self._request('GET', url, "Ошибка получения проектов", [])
     
     def get_project_with_cases(self, project_id: int) -> Dict:
         """Получение проекта со всеми тест-кейсами через /home endpoint"""
-        try:
-            url = f"{self.base_url}/home/{project_id}"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка получения структуры проекта: {e}")
-            return {}
+        url = f"{self.base_url}/home/{project_id}"
+        return self._request('GET', url, "Ошибка получения структуры проекта", {})
     
-    def get_folders(self, project_id: int) -> List[Dict]:
-        """Получение списка папок в проекте"""
-        try:
-            url = f"{self.base_url}/folders?projectId={project_id}"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка получения папок: {e}")
-            return []
+    def get_folders(self, project_id: int) -> Optional[List[Dict]]:
+        """Получение списка папок в проекте (None при ошибке, чтобы не спутать ее с пустым проектом)"""
+        url = f"{self.base_url}/folders?projectId={project_id}"
+        return self._request('GET', url, "Ошибка получения папок")
     
     def get_folder_by_id(self, folder_id: int) -> Optional[Dict]:
         """Получение информации о папке по ID"""
-        try:
-            url = f"{self.base_url}/folders/{folder_id}"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка получения папки {folder_id}: {e}")
-            return None
+        url = f"{self.base_url}/folders/{folder_id}"
+        return self._request('GET', url, f"Ошибка получения папки {folder_id}")
     
     def create_folder(self, project_id: int, name: str, detail: str = "", parent_id: Optional[int] = None) -> Optional[Dict]:
         """Создание новой папки"""
-        try:
-            url = f"{self.base_url}/folders?projectId={project_id}"
-            data = {
-                "name": name,
-                "detail": detail,
-                "parentFolderId": parent_id
-            }
-            response = self.session.post(url, json=data)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка создания папки: {e}")
-            return None
+        url = f"{self.base_url}/folders?projectId={project_id}"
+        data = {
+            "name": name,
+            "detail": detail,
+            "parentFolderId": parent_id
+        }
+        return self._request('POST', url, "Ошибка создания папки", json=data)
     
-    def get_all_cases_detailed(self, project_data: Dict) -> List[Dict]:
-        """Получение всех тест-кейсов с полной детализацией"""
-        all_cases = []
+    def get_all_cases_detailed(self, project_data: Dict, max_workers: int = 1) -> List[Dict]:
+        """
+        Получение всех тест-кейсов с полной детализацией
+        
+        Args:
+            project_data: Структура проекта из /home/{projectId}
+            max_workers: Максимальное число одновременных запросов к /cases/{caseId}
+            
+        Returns:
+            Список тест-кейсов в порядке папок и кейсов из project_data
+        """
+        return list(self.iter_cases_detailed(project_data, max_workers))
+    
+    def iter_cases_detailed(self, project_data: Dict, max_workers: int = 1, exclude_ids: Optional[set] = None,
+                            cache: Optional['CaseCache'] = None) -> Iterator[Dict]:
+        """
+        Потоковое получение тест-кейсов с полной детализацией
+        
+        В памяти одновременно находится не более 2 * max_workers загруженных кейсов,
+        поэтому генератор можно передавать напрямую в CSVHandler.export_to_csv.
+        Кейсы, для которых хватает данных из списка проекта (listing_has_case_details),
+        отдельно не запрашиваются.
+        
+        Args:
+            project_data: Структура проекта из /home/{projectId}
+            max_workers: Максимальное число одновременных запросов к /cases/{caseId}
+            exclude_ids: ID тест-кейсов, которые не нужно загружать (уже экспортированы)
+            cache: Локальный кэш деталей; загружаются только кейсы с измененным updatedAt
+            
+        Returns:
+            Итератор тест-кейсов в порядке папок и кейсов из project_data
+        """
+        exclude_ids = exclude_ids or set()
+        folder_paths = project_folder_paths(project_data)
         
         # Собираем все тест-кейсы из всех папок
-        folders = project_data.get('Folders', [])
-        
-        for folder in folders:
-            if 'Cases' in folder:
-                for case in folder['Cases']:
-                    # Получаем детальную информацию о каждом кейсе
-                    detailed_case = self.get_case(case['id'])
-                    if detailed_case:
-                        # Добавляем информацию о папке
-                        detailed_case['folderName'] = folder['name']
-                        detailed_case['folderId'] = folder['id']
-                        all_cases.append(detailed_case)
-                        
-        return all_cases
+        listed_cases = (
+            (folder, case)
+            for folder in project_data.get('Folders', [])
+            for case in folder.get('Cases', [])
+            if case['id'] not in exclude_ids
+        )
+        
+        def fetch(item):
+            folder, case = item
+            # Получаем детальную информацию о каждом кейсе (из списка, если его достаточно, или из кэша)
+            if listing_has_case_details(case):
+                detailed_case = dict(case)
+            else:
+                detailed_case = cache.get(case['id'], case.get('updatedAt')) if cache else None
+            if detailed_case is None:
+                detailed_case = self.get_case(case['id'])
+                if detailed_case and cache:
+                    cache.put(detailed_case)
+            if detailed_case:
+                # Добавляем информацию о папке (полный путь от корня проекта)
+                detailed_case['folderName'] = folder_paths[folder['id']]
+                detailed_case['folderId'] = folder['id']
+            return detailed_case
+        
+        for detailed_case in ordered_parallel_map(fetch, listed_cases, max_workers):
+            if detailed_case:
+                yield detailed_case
     
     def get_case(self, case_id: int) -> Optional[Dict]:
         """Получение детальной информации о тест-кейсе"""
-        try:
-            url = f"{self.base_url}/cases/{case_id}"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка получения тест-кейса {case_id}: {e}")
-            return None
+        url = f"{self.base_url}/cases/{case_id}"
+        return self._request('GET', url, f"Ошибка получения тест-кейса {case_id}")
     
     def create_case(self, folder_id: int, case_data: Dict) -> Optional[Dict]:
         """Создание нового тест-кейса"""
-        try:
-            url = f"{self.base_url}/cases?folderId={folder_id}"
-            response = self.session.post(url, json=case_data)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ошибка создания тест-кейса: {e}")
-            return None
+        url = f"{self.base_url}/cases?folderId={folder_id}"
+        return self._request('POST', url, "Ошибка создания тест-кейса", json=case_data)
     
     def update_case_steps(self, case_id: int, steps_data: List[Dict]) -> Optional[Dict]:
         """Обновление шагов тест-кейса через отдельный endpoint"""
@@ -198,7 +817,7 @@ class TMSClient:
             
             logger.info(f"Отправка POST запроса для обновления {len(steps_data)} шагов кейса {case_id}")
             
-            response = self.session.post(url, json=steps_data)
+            response = self._send('POST', url, json=steps_data)
             
             if response.status_code != 200:
                 logger.error(f"Ошибка HTTP {response.status_code}: {response.text}")
@@ -213,71 +832,175 @@ class TMSClient:
             return None
 
 class FolderManager:
-    """Менеджер для работы с папками и их валидации"""
+    """
+    Менеджер для работы с папками и их валидации
+    
+    Для каждого проекта строится один индекс папок (по ID, по имени и по пути от корня)
+    из единственного запроса /folders. Созданные папки сразу добавляются в индекс,
+    поэтому повторных запросов списка папок и папок по ID не требуется. Методы
+    потокобезопасны: одну и ту же папку параллельные вызовы не создадут дважды.
+    """
     
     def __init__(self, client: TMSClient):
         self.client = client
-        self.folders_cache = {}
+        self._indexes = {}
+        self._lock = threading.RLock()
+        self._create_locks = {}
     
-    def validate_and_get_folder(self, project_id: int, folder_id: int, folder_name: str) -> Optional[Dict]:
+    def load(self, project_id: int, refresh: bool = False) -> Dict[str, Dict]:
         """
-        Валидация папки по ID и имени. Если папка не существует или имя не совпадает - создаем новую.
+        Построение индекса папок проекта
         
         Args:
             project_id: ID проекта
-            folder_id: ID папки из CSV
-            folder_name: Имя папки из CSV
+            refresh: Загрузить список папок заново, даже если индекс уже построен
             
         Returns:
-            Словарь с информацией о папке или None в случае ошибки
+            Индекс {'by_id': {id: папка}, 'by_name': {имя: папка}, 'by_path': {(имя, ...): папка}}
+            
+        Raises:
+            RuntimeError: если список папок не удалось загрузить (индекс не строится,
+                чтобы не создавать заново папки, которые уже есть в проекте)
         """
-        try:
-            # Проверяем кэш
-            cache_key = f"{project_id}_{folder_id}"
-            if cache_key in self.folders_cache:
-                return self.folders_cache[cache_key]
-            
-            # Получаем информацию о папке по ID
-            existing_folder = self.client.get_folder_by_id(folder_id)
-            
-            if existing_folder and existing_folder.get('name') == folder_name:
-                # Папка существует и имя совпадает
-                logger.info(f"✓ Найдена существующая папка: {folder_name} (ID: {folder_id})")
-                self.folders_cache[cache_key] = existing_folder
+        with self._lock:
+            if refresh or project_id not in self._indexes:
+                folders = self.client.get_folders(project_id)
+                if folders is None:
+                    raise RuntimeError(f"не удалось загрузить список папок проекта {project_id}")
+                index = {'by_id': {}, 'by_name': {}, 'by_path': {}}
+                for folder in folders:
+                    index['by_id'][folder['id']] = folder
+                for folder in index['by_id'].values():
+                    self._add_to_index(index, folder)
+                self._indexes[project_id] = index
+            return self._indexes[project_id]
+    
+    def _add_to_index(self, index: Dict[str, Dict], folder: Dict) -> None:
+        index['by_id'][folder['id']] = folder
+        index['by_name'].setdefault(folder['name'], folder)
+        index['by_path'].setdefault(folder_path_names(index['by_id'], folder), folder)
+    
+    def folders(self, project_id: int) -> List[Dict]:
+        """Список всех папок проекта"""
+        with self._lock:
+            return list(self.load(project_id)['by_id'].values())
+    
+    def get_by_id(self, project_id: int, folder_id: int) -> Optional[Dict]:
+        """Папка проекта по ID"""
+        with self._lock:
+            return self.load(project_id)['by_id'].get(folder_id)
+    
+    def find_by_name(self, project_id: int, name: str) -> Optional[Dict]:
+        """Первая папка проекта с указанным именем"""
+        with self._lock:
+            return self.load(project_id)['by_name'].get(name)
+    
+    def find_by_path(self, project_id: int, path: tuple) -> Optional[Dict]:
+        """Папка проекта по пути от корня, например ('Модуль', 'Авторизация')"""
+        with self._lock:
+            return self.load(project_id)['by_path'].get(tuple(path))
+    
+    def create_folder(self, project_id: int, name: str, detail: str = "", parent_id: Optional[int] = None) -> Optional[Dict]:
+        """Создание папки с добавлением ее в индекс проекта"""
+        new_folder = self.client.create_folder(project_id, name, detail, parent_id)
+        if new_folder:
+            new_folder.setdefault('parentFolderId', parent_id)
+            with self._lock:
+                self._add_to_index(self.load(project_id), new_folder)
+        return new_folder
+    
+    def get_or_create_by_name(self, project_id: int, name: str, detail: str = "") -> tuple[Optional[Dict], bool]:
+        """
+        Поиск папки по имени или ее создание
+        
+        Returns:
+            Кортеж (папка или None, была ли папка создана)
+        """
+        with self._lock:
+            create_lock = self._create_locks.setdefault((project_id, name), threading.Lock())
+        
+        # Параллельные вызовы для одного имени ждут друг друга, для разных - нет
+        with create_lock:
+            existing_folder = self.find_by_name(project_id, name)
+            if existing_folder:
+                return existing_folder, False
+            return self.create_folder(project_id, name, detail), True
+    
+    def get_or_create_path(self, project_id: int, path: tuple, detail: str = "") -> Optional[Dict]:
+        """
+        Поиск папки по пути от корня или ее создание в уже существующей родительской папке
+        
+        Returns:
+            Папка или None, если ее не удалось создать или родительской папки нет
+        """
+        path = tuple(path)
+        with self._lock:
+            create_lock = self._create_locks.setdefault((project_id, path), threading.Lock())
+        
+        with create_lock:
+            existing_folder = self.find_by_path(project_id, path)
+            if existing_folder:
                 return existing_folder
-            else:
-                # Папка не существует или имя не совпадает - создаем новую
-                if existing_folder:
-                    logger.warning(f"⚠️ Папка ID {folder_id} существует, но имя не совпадает: '{existing_folder.get('name')}' != '{folder_name}'")
-                else:
-                    logger.info(f"ℹ️ Папка ID {folder_id} не найдена")
-                
-                logger.info(f"🔄 Создание новой папки: {folder_name}")
-                new_folder = self.client.create_folder(project_id, folder_name, f"Автоматически создана для импорта")
-                
-                if new_folder:
-                    logger.info(f"✓ Создана новая папка: {folder_name} (ID: {new_folder['id']})")
-                    # Обновляем кэш с новым ID
-                    new_cache_key = f"{project_id}_{new_folder['id']}"
-                    self.folders_cache[new_cache_key] = new_folder
-                    return new_folder
-                else:
-                    logger.error(f"✗ Ошибка создания папки: {folder_name}")
-                    return None
-                    
-        except Exception as e:
-            logger.error(f"✗ Ошибка валидации папки {folder_name} (ID: {folder_id}): {e}")
-            return None
+            parent = self.find_by_path(project_id, path[:-1]) if len(path) > 1 else None
+            if len(path) > 1 and not parent:
+                return None
+            return self.create_folder(project_id, path[-1], detail, parent['id'] if parent else None)
+    
+    def find_existing(self, project_id: int, folder_id: Optional[int], path: List[str],
+                      folder_name: Optional[str] = None) -> Optional[Dict]:
+        """
+        Поиск существующей папки для пары (ID, путь) из CSV без создания новых
+        
+        Папка с указанным ID используется, если совпадает ее путь (или имя, если путь
+        из одного имени, как в CSV без иерархии), иначе - папка по пути. Для пути из
+        одного имени подходит и вложенная папка с таким именем.
+        
+        folder_name - исходное значение folderName из CSV до разбора пути: в файлах
+        старого формата это имя папки, которое может само содержать '/' ('API/v2').
+        """
+        path = tuple(path)
+        existing_folder = self.get_by_id(project_id, folder_id) if folder_id else None
+        if existing_folder and folder_name is not None and existing_folder.get('name') == folder_name:
+            return existing_folder
+        if existing_folder:
+            with self._lock:
+                existing_path = folder_path_names(self.load(project_id)['by_id'], existing_folder)
+            if existing_path == path or (len(path) == 1 and existing_folder.get('name') == path[0]):
+                return existing_folder
+            logger.warning(f"⚠️ Папка ID {folder_id} существует, но путь не совпадает: "
+                           f"'{join_folder_path(existing_path)}' != '{join_folder_path(path)}'")
+        folder = self.find_by_path(project_id, path)
+        if not folder and len(path) == 1:
+            folder = self.find_by_name(project_id, path[0])
+        return folder
     
-    def get_all_folders_map(self, project_id: int) -> Dict[str, Dict]:
+    def ensure_folders(self, project_id: int, paths: Iterable[tuple], detail: str = "",
+                       max_workers: int = 1) -> Dict[tuple, Optional[Dict]]:
         """
-        Получение карты всех папок проекта (имя -> информация о папке)
+        Создание недостающих папок по путям от корня
+        
+        Папки создаются по уровням: сначала параллельно все недостающие папки первого
+        уровня, затем второго и т.д., поэтому число последовательных запросов равно
+        глубине дерева, а не количеству папок.
         
+        Args:
+            project_id: ID проекта
+            paths: Пути папок (кортежи имен от корня)
+            detail: Описание создаваемых папок
+            max_workers: Максимальное число одновременных запросов
+            
         Returns:
-            Словарь где ключ - имя папки, значение - информация о папке
+            Словарь путь -> папка (None, если папку создать не удалось)
         """
-        folders = self.client.get_folders(project_id)
-        return {folder['name']: folder for folder in folders}
+        paths = list(dict.fromkeys(tuple(path) for path in paths))
+        depth = max((len(path) for path in paths), default=0)
+        for level in range(1, depth + 1):
+            prefixes = list(dict.fromkeys(path[:level] for path in paths if len(path) >= level))
+            missing = [prefix for prefix in prefixes if not self.find_by_path(project_id, prefix)]
+            for _ in ordered_parallel_map(lambda prefix: self.get_or_create_path(project_id, prefix, detail),
+                                          missing, max_workers):
+                pass
+        return {path: self.find_by_path(project_id, path) for path in paths}
 
 class CSVHandler:
     """Обработчик CSV файлов для тест-кейсов в табличном формате"""
@@ -290,86 +1013,116 @@ class CSVHandler:
     ]
     
     @classmethod
-    def export_to_csv(cls, test_cases: List[Dict], file_path: str) -> bool:
-        """Экспорт тест-кейсов в CSV файл в табличном формате"""
+    def export_to_csv(cls, test_cases: Iterable[Dict], file_path: str, journal: Optional['ExportJournal'] = None) -> bool:
+        """
+        Экспорт тест-кейсов в CSV файл в табличном формате
+        
+        test_cases может быть генератором (например, TMSClient.iter_cases_detailed):
+        кейсы записываются по мере поступления и не накапливаются в памяти.
+        
+        Файлы с расширением .gz и .zst сжимаются потоково (см. open_text_file).
+        
+        Args:
+            test_cases: Тест-кейсы для экспорта
+            file_path: Путь к CSV файлу
+            journal: Журнал контрольных точек. Если в нем уже есть записанные кейсы,
+                файл обрезается до последней контрольной точки и дописывается.
+                Для сжатых файлов контрольные точки не ведутся и продолжение невозможно
+        """
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            def make_writer(csvfile) -> Callable[[Dict], None]:
                 writer = csv.writer(csvfile, delimiter=';')
-                
-                # Записываем заголовок
-                writer.writerow(cls.CSV_HEADERS + [''])  # Добавляем пустую колонку в конце
-                
-                for case in test_cases:
-                    # Основная строка с информацией о тест-кейсе
-                    main_row = [
-                        case.get('id', ''),
-                        case.get('title', ''),
-                        case.get('state', 0),
-                        case.get('priority', 1),
-                        case.get('type', 0),
-                        case.get('automationStatus', 0),
-                        case.get('description', ''),
-                        '',  # pre_conditions будет в отдельных строках
-                        '',  # expected_results будет в отдельных строках
-                        case.get('template', 0),
-                        '',  # steps номер шага
-                        '',  # result описание шага
-                        case.get('folderId', ''),
-                        case.get('folderName', ''),
-                        case.get('createdAt', ''),
-                        case.get('updatedAt', ''),
-                        ''  # Пустая колонка в конце
-                    ]
-                    
-                    # Если есть шаги
-                    if case.get('Steps') and case.get('template') == 1:
-                        # Первая строка с основной информацией и первым шагом
-                        steps = case['Steps']
-                        if steps:
-                            first_step = steps[0]
-                            main_row[10] = f"{first_step.get('caseSteps', {}).get('stepNo', 1)}. {first_step.get('step', '')}"
-                            main_row[11] = first_step.get('result', '')
-                        
-                        writer.writerow(main_row)
-                        
-                        # Остальные шаги в отдельных строках
-                        for step in steps[1:]:
-                            step_row = [''] * len(cls.CSV_HEADERS) + ['']
-                            step_row[10] = f"{step.get('caseSteps', {}).get('stepNo', 1)}. {step.get('step', '')}"
-                            step_row[11] = step.get('result', '')
-                            writer.writerow(step_row)
-                    
-                    # Если есть предусловия
-                    elif case.get('preConditions'):
-                        # Разбиваем предусловия на строки
-                        preconditions = case['preConditions'].split('\n')
-                        if preconditions:
-                            main_row[10] = preconditions[0]
-                            main_row[11] = case.get('expectedResults', '')
-                            writer.writerow(main_row)
-                            
-                            # Остальные предусловия в отдельных строках
-                            for precondition in preconditions[1:]:
-                                if precondition.strip():
-                                    precondition_row = [''] * len(cls.CSV_HEADERS) + ['']
-                                    precondition_row[10] = precondition.strip()
-                                    writer.writerow(precondition_row)
-                        else:
-                            writer.writerow(main_row)
-                    else:
-                        # Простой тест-кейс без шагов
-                        if case.get('preConditions'):
-                            main_row[10] = case['preConditions']
-                        main_row[11] = case.get('expectedResults', '')
-                        writer.writerow(main_row)
+                return lambda case: writer.writerows(cls._case_to_rows(case))
+            
+            def write_header(csvfile) -> None:
+                # Добавляем пустую колонку в конце
+                csv.writer(csvfile, delimiter=';').writerow(cls.CSV_HEADERS + [''])
             
-            logger.info(f"✓ Экспортировано {len(test_cases)} тест-кейсов в {file_path}")
+            exported_count = write_journaled_file(
+                test_cases, file_path, journal, make_writer, write_header, encoding='utf-8-sig', newline=''
+            )
+            
+            logger.info(f"✓ Экспортировано {exported_count} тест-кейсов в {file_path}")
             return True
             
         except Exception as e:
             logger.error(f"✗ Ошибка экспорта в CSV: {e}")
             return False
     
+    @classmethod
+    def _case_to_rows(cls, case: Dict) -> Iterator[List]:
+        """
+        Преобразование тест-кейса в строки CSV
+        
+        Args:
+            case: Детальная информация о тест-кейсе
+            
+        Returns:
+            Итератор строк: основная строка и строки продолжения (шаги, предусловия)
+        """
+        # Основная строка с информацией о тест-кейсе
+        main_row = [
+            case.get('id', ''),
+            case.get('title', ''),
+            case.get('state', 0),
+            case.get('priority', 1),
+            case.get('type', 0),
+            case.get('automationStatus', 0),
+            case.get('description', ''),
+            '',  # pre_conditions будет в отдельных строках
+            '',  # expected_results будет в отдельных строках
+            case.get('template', 0),
+            '',  # steps номер шага
+            '',  # result описание шага
+            case.get('folderId', ''),
+            case.get('folderName', ''),
+            case.get('createdAt', ''),
+            case.get('updatedAt', ''),
+            ''  # Пустая колонка в конце
+        ]
+        
+        # Если есть шаги
+        if case.get('Steps') and case.get('template') == 1:
+            # Первая строка с основной информацией и первым шагом
+            steps = case['Steps']
+            if steps:
+                first_step = steps[0]
+                main_row[10] = f"{first_step.get('caseSteps', {}).get('stepNo', 1)}. {first_step.get('step', '')}"
+                main_row[11] = first_step.get('result', '')
+            
+            yield main_row
+            
+            # Остальные шаги в отдельных строках
+            for step in steps[1:]:
+                step_row = [''] * len(cls.CSV_HEADERS) + ['']
+                step_row[10] = f"{step.get('caseSteps', {}).get('stepNo', 1)}. {step.get('step', '')}"
+                step_row[11] = step.get('result', '')
+                yield step_row
+        
+        # Если есть предусловия
+        elif case.get('preConditions'):
+            # Разбиваем предусловия на строки
+            preconditions = case['preConditions'].split('\n')
+            if preconditions:
+                main_row[10] = preconditions[0]
+                main_row[11] = case.get('expectedResults', '')
+                yield main_row
+                
+                # Остальные предусловия в отдельных строках
+                for precondition in preconditions[1:]:
+                    if precondition.strip():
+                        precondition_row = [''] * len(cls.CSV_HEADERS) + ['']
+                        precondition_row[10] = precondition.strip()
+                        yield precondition_row
+            else:
+                yield main_row
+        else:
+            # Простой тест-кейс без шагов
+            if case.get('preConditions'):
+                main_row[10] = case['preConditions']
+            main_row[11] = case.get('expectedResults', '')
+            yield main_row
+    
     @classmethod
     def import_from_csv(cls, file_path: str) -> Dict[str, List[Dict]]:
         """
@@ -379,86 +1132,87 @@ class CSVHandler:
             Словарь где ключ - это либо имя папки, либо 'unassigned' для нераспределенных кейсов
         """
         try:
-            cases_by_folder = {}
-            current_case = None
+            return group_cases_by_folder(cls.iter_cases_from_csv(file_path), file_path)
+        except Exception as e:
+            logger.error(f"✗ Ошибка импорта из CSV: {e}")
+            return {}
+    
+    @classmethod
+    def iter_cases_from_csv(cls, file_path: str) -> Iterator[tuple[str, Dict]]:
+        """
+        Потоковый разбор CSV файла в табличном формате
+        
+        Тест-кейс отдается сразу, как только следующая строка с ID (или конец файла)
+        его закрывает, поэтому в памяти находится только текущий кейс. Сжатые файлы
+        (.gz, .zst) распаковываются на лету. Ошибки чтения и разбора пробрасываются
+        вызывающему коду.
+        
+        Returns:
+            Итератор пар (ключ папки, тест-кейс) в порядке строк файла
+        """
+        current_case = None
+        
+        with open_text_file(file_path, 'r', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile, delimiter=';')
+            headers = next(reader)  # Пропускаем заголовок
             
-            with open(file_path, 'r', encoding='utf-8-sig') as csvfile:
-                reader = csv.reader(csvfile, delimiter=';')
-                headers = next(reader)  # Пропускаем заголовок
+            for row in reader:
+                if len(row) < len(cls.CSV_HEADERS):
+                    # Дополняем строку пустыми значениями
+                    row.extend([''] * (len(cls.CSV_HEADERS) - len(row)))
                 
-                for row in reader:
-                    if len(row) < len(cls.CSV_HEADERS):
-                        # Дополняем строку пустыми значениями
-                        row.extend([''] * (len(cls.CSV_HEADERS) - len(row)))
+                # Если есть ID в первой колонке - это начало нового тест-кейса
+                if row[0].strip():  # id не пустой
+                    # Отдаем предыдущий кейс если был
+                    if current_case:
+                        yield cls._get_folder_key(current_case), current_case
                     
-                    # Если есть ID в первой колонке - это начало нового тест-кейса
-                    if row[0].strip():  # id не пустой
-                        # Сохраняем предыдущий кейс если был
-                        if current_case:
-                            folder_key = cls._get_folder_key(current_case)
-                            if folder_key not in cases_by_folder:
-                                cases_by_folder[folder_key] = []
-                            cases_by_folder[folder_key].append(current_case)
-                        
-                        # Создаем новый кейс
-                        current_case = {
-                            'id': row[0].strip() if row[0].strip() else None,
-                            'title': row[1].strip(),
-                            'state': int(row[2]) if row[2].strip() else 0,
-                            'priority': int(row[3]) if row[3].strip() else 1,
-                            'type': int(row[4]) if row[4].strip() else 0,
-                            'automationStatus': int(row[5]) if row[5].strip() else 0,
-                            'description': row[6].strip(),
-                            'template': int(row[9]) if row[9].strip() else 0,
-                            'folderId': int(row[12]) if row[12].strip() and row[12].isdigit() else None,
-                            'folderName': row[13].strip() if row[13].strip() else None,
-                            'steps': [],
-                            'preConditions': '',
-                            'expectedResults': row[11].strip()
-                        }
-                        
-                        # Добавляем первый шаг/предусловие если есть
-                        if row[10].strip():
-                            if current_case['template'] == 1:  # Пошаговый
-                                current_case['steps'].append({
-                                    'step': row[10].strip(),
-                                    'result': row[11].strip(),
-                                    'stepNo': 1
-                                })
-                            else:  # Простой
-                                current_case['preConditions'] = row[10].strip()
+                    # Создаем новый кейс
+                    current_case = {
+                        'id': row[0].strip() if row[0].strip() else None,
+                        'title': row[1].strip(),
+                        'state': int(row[2]) if row[2].strip() else 0,
+                        'priority': int(row[3]) if row[3].strip() else 1,
+                        'type': int(row[4]) if row[4].strip() else 0,
+                        'automationStatus': int(row[5]) if row[5].strip() else 0,
+                        'description': row[6].strip(),
+                        'template': int(row[9]) if row[9].strip() else 0,
+                        'folderId': int(row[12]) if row[12].strip() and row[12].isdigit() else None,
+                        'folderName': row[13].strip() if row[13].strip() else None,
+                        'steps': [],
+                        'preConditions': '',
+                        'expectedResults': row[11].strip()
+                    }
                     
-                    # Если ID пустой - это продолжение текущего кейса (дополнительный шаг)
-                    elif current_case and row[10].strip():
+                    # Добавляем первый шаг/предусловие если есть
+                    if row[10].strip():
                         if current_case['template'] == 1:  # Пошаговый
-                            step_no = len(current_case['steps']) + 1
                             current_case['steps'].append({
                                 'step': row[10].strip(),
                                 'result': row[11].strip(),
-                                'stepNo': step_no
+                                'stepNo': 1
                             })
-                        else:  # Простой - добавляем к предусловиям
-                            if current_case['preConditions']:
-                                current_case['preConditions'] += '\n' + row[10].strip()
-                            else:
-                                current_case['preConditions'] = row[10].strip()
+                        else:  # Простой
+                            current_case['preConditions'] = row[10].strip()
                 
-                # Не забываем последний кейс
-                if current_case:
-                    folder_key = cls._get_folder_key(current_case)
-                    if folder_key not in cases_by_folder:
-                        cases_by_folder[folder_key] = []
-                    cases_by_folder[folder_key].append(current_case)
-            
-            total_cases = sum(len(cases) for cases in cases_by_folder.values())
-            logger.info(f"✓ Загружено {total_cases} тест-кейсов из {file_path}")
-            logger.info(f"ℹ️ Распределение по папкам: {dict((k, len(v)) for k, v in cases_by_folder.items())}")
-            
-            return cases_by_folder
+                # Если ID пустой - это продолжение текущего кейса (дополнительный шаг)
+                elif current_case and row[10].strip():
+                    if current_case['template'] == 1:  # Пошаговый
+                        step_no = len(current_case['steps']) + 1
+                        current_case['steps'].append({
+                            'step': row[10].strip(),
+                            'result': row[11].strip(),
+                            'stepNo': step_no
+                        })
+                    else:  # Простой - добавляем к предусловиям
+                        if current_case['preConditions']:
+                            current_case['preConditions'] += '\n' + row[10].strip()
+                        else:
+                            current_case['preConditions'] = row[10].strip()
             
-        except Exception as e:
-            logger.error(f"✗ Ошибка импорта из CSV: {e}")
-            return {}
+            # Не забываем последний кейс
+            if current_case:
+                yield cls._get_folder_key(current_case), current_case
     
     @classmethod
     def _get_folder_key(cls, test_case: Dict) -> str:
@@ -481,13 +1235,799 @@ class CSVHandler:
             # Нераспределенные тест-кейсы
             return 'unassigned'
 
+class JSONLHandler:
+    """
+    Обработчик файлов JSON Lines: один тест-кейс на строку, шаги вложены в кейс
+    
+    Каждая строка - тест-кейс в формате API (/cases/{caseId}) с полями folderId
+    и folderName, поэтому экспорт и импорт выполняются без потерь, а разбор не
+    требует склейки строк продолжения, как в CSV.
+    """
+    
+    @classmethod
+    def export_to_jsonl(cls, test_cases: Iterable[Dict], file_path: str, journal: Optional['ExportJournal'] = None) -> bool:
+        """
+        Экспорт тест-кейсов в файл JSON Lines
+        
+        Args:
+            test_cases: Тест-кейсы для экспорта (может быть генератором)
+            file_path: Путь к файлу (.jsonl, .jsonl.gz, .jsonl.zst)
+            journal: Журнал контрольных точек, как в CSVHandler.export_to_csv
+        """
+        try:
+            def make_writer(jsonl_file) -> Callable[[Dict], None]:
+                return lambda case: jsonl_file.write(json.dumps(case, ensure_ascii=False, separators=(',', ':')) + '\n')
+            
+            exported_count = write_journaled_file(test_cases, file_path, journal, make_writer, newline='\n')
+            
+            logger.info(f"✓ Экспортировано {exported_count} тест-кейсов в {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"✗ Ошибка экспорта в JSONL: {e}")
+            return False
+    
+    @classmethod
+    def import_from_jsonl(cls, file_path: str) -> Dict[str, List[Dict]]:
+        """
+        Импорт тест-кейсов из файла JSON Lines
+        
+        Returns:
+            Словарь где ключ - это либо путь папки, либо 'unassigned' для нераспределенных кейсов
+        """
+        try:
+            return group_cases_by_folder(cls.iter_cases_from_jsonl(file_path), file_path)
+        except Exception as e:
+            logger.error(f"✗ Ошибка импорта из JSONL: {e}")
+            return {}
+    
+    @classmethod
+    def iter_cases_from_jsonl(cls, file_path: str) -> Iterator[tuple[str, Dict]]:
+        """
+        Потоковый разбор файла JSON Lines
+        
+        Returns:
+            Итератор пар (ключ папки, тест-кейс) в формате CSVHandler.iter_cases_from_csv
+        """
+        with open_text_file(file_path, 'r', encoding='utf-8') as jsonl_file:
+            for line_no, line in enumerate(jsonl_file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"строка {line_no}: {e}")
+                test_case = cls.record_to_case(record)
+                yield CSVHandler._get_folder_key(test_case), test_case
+    
+    @staticmethod
+    def record_to_case(record: Dict) -> Dict:
+        """Преобразование тест-кейса в формате API в формат импорта"""
+        steps = sorted(record.get('Steps') or [], key=lambda step: (step.get('caseSteps') or {}).get('stepNo', 0))
+        folder_id = record.get('folderId')
+        return {
+            'id': str(record['id']) if record.get('id') is not None else None,
+            'title': record.get('title') or '',
+            'state': record.get('state') or 0,
+            'priority': record['priority'] if record.get('priority') is not None else 1,
+            'type': record.get('type') or 0,
+            'automationStatus': record.get('automationStatus') or 0,
+            'description': record.get('description') or '',
+            'template': record.get('template') or 0,
+            'folderId': int(folder_id) if str(folder_id).isdigit() else None,
+            'folderName': record.get('folderName') or None,
+            'steps': [
+                {'step': step.get('step') or '', 'result': step.get('result') or '', 'stepNo': n}
+                for n, step in enumerate(steps, 1)
+            ],
+            'preConditions': record.get('preConditions') or '',
+            'expectedResults': record.get('expectedResults') or ''
+        }
+
+class SnapshotStore:
+    """
+    Локальный снимок проектов TMS в SQLite
+    
+    Таблицы projects, folders, cases и steps повторяют структуру TMS и позволяют
+    строить отчеты и сравнивать выгрузки SQL-запросами без обращения к API. Полный
+    экспорт проекта заменяет его снимок в одной транзакции, тест-кейсы и шаги
+    вставляются пакетами через executemany. Снимок можно использовать как источник
+    импорта.
+    """
+    
+    # Не больше лимита параметров запроса в старых версиях SQLite (999) для IN (...)
+    BATCH_SIZE = 900
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            detail TEXT,
+            exported_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS folders (
+            id INTEGER PRIMARY KEY,
+            project_id INTEGER NOT NULL,
+            parent_id INTEGER,
+            name TEXT NOT NULL,
+            path TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS cases (
+            id INTEGER PRIMARY KEY,
+            project_id INTEGER NOT NULL,
+            folder_id INTEGER,
+            title TEXT NOT NULL,
+            state INTEGER,
+            priority INTEGER,
+            type INTEGER,
+            automation_status INTEGER,
+            description TEXT,
+            pre_conditions TEXT,
+            expected_results TEXT,
+            template INTEGER,
+            created_at TEXT,
+            updated_at TEXT,
+            position INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS steps (
+            case_id INTEGER NOT NULL,
+            step_no INTEGER NOT NULL,
+            step TEXT,
+            result TEXT,
+            PRIMARY KEY (case_id, step_no)
+        );
+        CREATE INDEX IF NOT EXISTS idx_folders_project ON folders (project_id);
+        CREATE INDEX IF NOT EXISTS idx_cases_project ON cases (project_id, position);
+        CREATE INDEX IF NOT EXISTS idx_cases_folder ON cases (folder_id);
+        CREATE INDEX IF NOT EXISTS idx_cases_updated_at ON cases (updated_at);
+        CREATE INDEX IF NOT EXISTS idx_cases_title ON cases (title);
+    """
+    
+    def __init__(self, path: str, read_only: bool = False):
+        """
+        Args:
+            path: Путь к базе
+            read_only: Открыть существующую базу только для чтения (источник импорта):
+                файл не изменяется, схема и режим журнала не трогаются
+        """
+        import sqlite3
+        
+        self.path = path
+        if read_only:
+            self.connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+            return
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+    
+    @classmethod
+    def export_to_sqlite(cls, test_cases: Iterable[Dict], file_path: str, project: Dict, project_data: Dict,
+                         journal: Optional['ExportJournal'] = None, deleted_ids: Optional[set] = None) -> bool:
+        """
+        Экспорт тест-кейсов проекта в снимок SQLite
+        
+        Args:
+            test_cases: Тест-кейсы для экспорта (может быть генератором)
+            file_path: Путь к базе (.sqlite, .sqlite3, .db); база создается, если ее нет
+            project: Проект
+            project_data: Структура проекта из /home/{projectId} (папки)
+            journal: Журнал экспорта; в нем только отмечаются записанные кейсы,
+                продолжение прерванного экспорта не поддерживается
+            deleted_ids: Для инкрементального экспорта - ID удаленных тест-кейсов.
+                Снимок проекта тогда не заменяется, а дополняется изменениями
+        """
+        if file_compression(file_path):
+            logger.error(f"✗ Снимок SQLite не может быть сжатым файлом: {file_path}")
+            return False
+        if journal is not None and journal.done_ids:
+            logger.error(f"✗ Продолжение экспорта в SQLite не поддерживается: {file_path}")
+            return False
+        
+        try:
+            store = cls(file_path)
+            try:
+                exported_count = store.write_project(project, project_data, test_cases, journal, deleted_ids)
+            finally:
+                store.close()
+            logger.info(f"✓ Экспортировано {exported_count} тест-кейсов в {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"✗ Ошибка экспорта в SQLite: {e}")
+            return False
+    
+    @classmethod
+    def import_from_sqlite(cls, file_path: str, project_id: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Импорт тест-кейсов проекта из снимка SQLite
+        
+        Args:
+            file_path: Путь к базе
+            project_id: Проект снимка (можно не указывать, если в базе один проект)
+            
+        Returns:
+            Словарь где ключ - это либо путь папки, либо 'unassigned' для нераспределенных кейсов
+        """
+        try:
+            return group_cases_by_folder(cls.iter_cases_from_sqlite(file_path, project_id), file_path)
+        except Exception as e:
+            logger.error(f"✗ Ошибка импорта из SQLite: {e}")
+            return {}
+    
+    @classmethod
+    def iter_cases_from_sqlite(cls, file_path: str, project_id: Optional[int] = None) -> Iterator[tuple[str, Dict]]:
+        """
+        Потоковое чтение тест-кейсов проекта из снимка SQLite (база открывается только для чтения)
+        
+        Returns:
+            Итератор пар (ключ папки, тест-кейс) в формате CSVHandler.iter_cases_from_csv
+            
+        Raises:
+            ValueError: если проект снимка не указан или не найден
+        """
+        store = cls(file_path, read_only=True)
+        try:
+            project_ids = store.project_ids()
+            if project_id is None and len(project_ids) == 1:
+                project_id = project_ids[0]
+            if project_id not in project_ids:
+                raise ValueError(f"укажите проект снимка (--source-project-id), доступны: {project_ids}")
+            for record in store.iter_records(project_id):
+                test_case = JSONLHandler.record_to_case(record)
+                yield CSVHandler._get_folder_key(test_case), test_case
+        finally:
+            store.close()
+    
+    def write_project(self, project: Dict, project_data: Dict, test_cases: Iterable[Dict],
+                      journal: Optional['ExportJournal'] = None, deleted_ids: Optional[set] = None) -> int:
+        """
+        Запись проекта, его папок и тест-кейсов одной транзакцией
+        
+        Returns:
+            Количество записанных тест-кейсов
+        """
+        project_id = project['id']
+        folder_paths = project_folder_paths(project_data)
+        exported_count = 0
+        
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO projects (id, name, detail, exported_at) VALUES (?, ?, ?, ?)",
+                (project_id, project['name'], project.get('detail'), datetime.now().isoformat(timespec='seconds'))
+            )
+            if deleted_ids is None:
+                # Полный экспорт заменяет снимок проекта
+                self.connection.execute(
+                    "DELETE FROM steps WHERE case_id IN (SELECT id FROM cases WHERE project_id = ?)", (project_id,)
+                )
+                self.connection.execute("DELETE FROM cases WHERE project_id = ?", (project_id,))
+                self.connection.execute("DELETE FROM folders WHERE project_id = ?", (project_id,))
+            else:
+                self._delete_cases(list(deleted_ids))
+            
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO folders (id, project_id, parent_id, name, path) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (folder['id'], project_id, folder.get('parentFolderId'), folder['name'], folder_paths[folder['id']])
+                    for folder in project_data.get('Folders', [])
+                ]
+            )
+            
+            # Новые тест-кейсы получают позиции после уже записанных, порядок экспорта сохраняется
+            position = self.connection.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM cases WHERE project_id = ?", (project_id,)
+            ).fetchone()[0]
+            batch = []
+            for case in test_cases:
+                batch.append(case)
+                if len(batch) >= self.BATCH_SIZE:
+                    exported_count += self._write_cases(project_id, batch, journal, position + exported_count)
+                    batch = []
+            exported_count += self._write_cases(project_id, batch, journal, position + exported_count)
+        
+        return exported_count
+    
+    def _write_cases(self, project_id: int, cases: List[Dict], journal: Optional['ExportJournal'],
+                     position: int) -> int:
+        """
+        Пакетная вставка тест-кейсов и их шагов (внутри транзакции write_project)
+        
+        Кейсы получают позиции начиная с position; уже записанный кейс при обновлении
+        сохраняет свою позицию.
+        """
+        if not cases:
+            return 0
+        case_ids = [case['id'] for case in cases]
+        placeholders = ','.join('?' * len(case_ids))
+        positions = dict(self.connection.execute(
+            f"SELECT id, position FROM cases WHERE id IN ({placeholders})", case_ids
+        ))
+        self._delete_cases(case_ids, steps_only=True)
+        self.connection.executemany("""
+            INSERT OR REPLACE INTO cases (
+                id, project_id, folder_id, title, state, priority, type, automation_status,
+                description, pre_conditions, expected_results, template, created_at, updated_at, position
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                case['id'], project_id, case.get('folderId'), case.get('title', ''), case.get('state'),
+                case.get('priority'), case.get('type'), case.get('automationStatus'), case.get('description'),
+                case.get('preConditions'), case.get('expectedResults'), case.get('template'),
+                case.get('createdAt'), case.get('updatedAt'), positions.get(case['id'], position + n)
+            )
+            for n, case in enumerate(cases)
+        ])
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO steps (case_id, step_no, step, result) VALUES (?, ?, ?, ?)",
+            [
+                (case['id'], (step.get('caseSteps') or {}).get('stepNo', n), step.get('step'), step.get('result'))
+                for case in cases
+                for n, step in enumerate(case.get('Steps') or [], 1)
+            ]
+        )
+        if journal is not None:
+            for case in cases:
+                journal.mark_done(case['id'])
+        return len(cases)
+    
+    def _delete_cases(self, case_ids: List[int], steps_only: bool = False) -> None:
+        """Удаление тест-кейсов (или только их шагов) по списку ID"""
+        tables = ('steps',) if steps_only else ('steps', 'cases')
+        for start in range(0, len(case_ids), self.BATCH_SIZE):
+            chunk = case_ids[start:start + self.BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            for table in tables:
+                column = 'case_id' if table == 'steps' else 'id'
+                self.connection.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", chunk)
+    
+    def project_ids(self) -> List[int]:
+        """ID проектов в снимке"""
+        return [row[0] for row in self.connection.execute("SELECT id FROM projects ORDER BY id")]
+    
+    def iter_records(self, project_id: int) -> Iterator[Dict]:
+        """
+        Тест-кейсы проекта из снимка в формате API (с вложенными шагами)
+        
+        Returns:
+            Итератор тест-кейсов в порядке их записи при экспорте
+        """
+        cursor = self.connection.execute("""
+            SELECT c.id, c.title, c.state, c.priority, c.type, c.automation_status, c.description,
+                   c.pre_conditions, c.expected_results, c.template, c.created_at, c.updated_at,
+                   c.folder_id, f.path
+            FROM cases c LEFT JOIN folders f ON f.id = c.folder_id
+            WHERE c.project_id = ?
+            ORDER BY c.position
+        """, (project_id,))
+        for row in cursor:
+            steps = self.connection.execute(
+                "SELECT step_no, step, result FROM steps WHERE case_id = ? ORDER BY step_no", (row[0],)
+            ).fetchall()
+            yield {
+                'id': row[0],
+                'title': row[1],
+                'state': row[2],
+                'priority': row[3],
+                'type': row[4],
+                'automationStatus': row[5],
+                'description': row[6],
+                'preConditions': row[7],
+                'expectedResults': row[8],
+                'template': row[9],
+                'createdAt': row[10],
+                'updatedAt': row[11],
+                'folderId': row[12],
+                'folderName': row[13],
+                'Steps': [
+                    {'step': step, 'result': result, 'caseSteps': {'stepNo': step_no}}
+                    for step_no, step, result in steps
+                ],
+            }
+    
+    def close(self) -> None:
+        """Закрытие базы"""
+        self.connection.close()
+
+class CaseCache:
+    """
+    Локальный кэш детальной информации о тест-кейсах в SQLite
+    
+    Кэшированная запись считается актуальной, если ее updatedAt совпадает со значением
+    из списка кейсов /home/{projectId}, поэтому при повторном экспорте загружаются
+    только измененные кейсы. Устаревшие записи вытесняются по возрасту и количеству.
+    """
+    
+    COMMIT_EVERY = 500
+    
+    def __init__(self, path: str, max_age_days: float = 30, max_entries: int = 200000):
+        import sqlite3
+        
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS cases (
+                id INTEGER PRIMARY KEY,
+                updated_at TEXT,
+                payload TEXT NOT NULL,
+                cached_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_cases_cached_at ON cases (cached_at)")
+        self.connection.commit()
+    
+    def get(self, case_id: int, updated_at: Optional[str]) -> Optional[Dict]:
+        """
+        Получение тест-кейса из кэша
+        
+        Args:
+            case_id: ID тест-кейса
+            updated_at: updatedAt из списка кейсов проекта
+            
+        Returns:
+            Детальная информация о тест-кейсе или None, если записи нет или она устарела
+        """
+        with self._lock:
+            row = None
+            if updated_at:
+                row = self.connection.execute(
+                    "SELECT payload FROM cases WHERE id = ? AND updated_at = ?", (case_id, updated_at)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, case: Dict) -> None:
+        """Сохранение детальной информации о тест-кейсе"""
+        payload = {key: value for key, value in case.items() if key not in ('folderId', 'folderName')}
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cases (id, updated_at, payload, cached_at) VALUES (?, ?, ?, ?)",
+                (case['id'], case.get('updatedAt'), json.dumps(payload, ensure_ascii=False), time.time())
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.COMMIT_EVERY:
+                self.connection.commit()
+                self._pending_writes = 0
+    
+    def evict(self) -> int:
+        """
+        Вытеснение записей старше max_age_days и сверх max_entries (самые старые)
+        
+        Returns:
+            Количество удаленных записей
+        """
+        with self._lock:
+            removed = self.connection.execute(
+                "DELETE FROM cases WHERE cached_at < ?", (time.time() - self.max_age_days * 86400,)
+            ).rowcount
+            removed += self.connection.execute("""
+                DELETE FROM cases WHERE id IN (
+                    SELECT id FROM cases ORDER BY cached_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,)).rowcount
+            self.connection.commit()
+        return removed
+    
+    def stats_report(self) -> str:
+        """Строка со статистикой попаданий и промахов"""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return f"попаданий {self.hits}, промахов {self.misses} ({hit_rate:.1f}% из кэша)"
+    
+    def close(self) -> None:
+        """Сохранение изменений и закрытие базы"""
+        with self._lock:
+            self.connection.commit()
+            self.connection.close()
+
+class ExportJournal:
+    """
+    Журнал контрольных точек экспорта
+    
+    Хранится рядом с CSV в формате JSON Lines: первая строка - заголовок с ID проекта
+    и путем к CSV, далее по строке на каждый полностью записанный тест-кейс с его ID
+    и размером CSV файла после записи. По журналу прерванный экспорт продолжается
+    с последней контрольной точки без повторной загрузки записанных кейсов.
+    """
+    
+    def __init__(self, project_id: int, directory: str = "./"):
+        self.project_id = project_id
+        self.journal_path = os.path.join(directory, f".tms_export_{project_id}.journal")
+        self.file_path = None
+        self.offset = 0
+        self.done_ids = set()
+        self._journal_file = None
+    
+    def load(self) -> bool:
+        """
+        Загрузка журнала незавершенного экспорта
+        
+        Returns:
+            True если найден журнал, CSV файл которого существует
+        """
+        if not os.path.exists(self.journal_path):
+            return False
+        
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Последняя строка могла быть записана не полностью
+                        break
+                    if 'file_path' in entry:
+                        self.file_path = entry['file_path']
+                        self.offset = entry['offset']
+                    else:
+                        self.done_ids.add(entry['id'])
+                        self.offset = entry['offset']
+        except OSError as e:
+            logger.error(f"✗ Ошибка чтения журнала экспорта {self.journal_path}: {e}")
+            return False
+        
+        return bool(self.file_path) and os.path.exists(self.file_path)
+    
+    def start(self, file_path: str, offset: int) -> None:
+        """Начало нового журнала для CSV файла с записанным заголовком"""
+        self.close()
+        self.file_path = file_path
+        self.offset = offset
+        self.done_ids = set()
+        self._write({'project_id': self.project_id, 'file_path': file_path, 'offset': offset}, mode='w')
+    
+    def mark_done(self, case_id: int) -> None:
+        """Учет записанного тест-кейса без контрольной точки (сжатый файл нельзя дописать)"""
+        self.done_ids.add(case_id)
+    
+    def record(self, case_id: int, offset: int) -> None:
+        """Запись контрольной точки после полностью записанного тест-кейса"""
+        self.done_ids.add(case_id)
+        self.offset = offset
+        self._write({'id': case_id, 'offset': offset})
+    
+    def _write(self, entry: Dict, mode: str = 'a') -> None:
+        if self._journal_file is None or mode == 'w':
+            self._journal_file = open(self.journal_path, mode, encoding='utf-8')
+        self._journal_file.write(json.dumps(entry) + '\n')
+        self._journal_file.flush()
+    
+    def close(self) -> None:
+        """Закрытие файла журнала"""
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+    
+    def remove(self) -> None:
+        """Удаление журнала после успешного завершения экспорта"""
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+class ExportState:
+    """
+    Снимок состояния проекта на момент последнего экспорта
+    
+    Хранит отметку high-water (максимальный updatedAt) и множество ID тест-кейсов
+    проекта. По нему инкрементальный экспорт определяет созданные, измененные
+    и удаленные с прошлого запуска кейсы без загрузки их деталей.
+    """
+    
+    def __init__(self, project_id: int, directory: str = "./"):
+        self.project_id = project_id
+        self.state_path = os.path.join(directory, f".tms_state_{project_id}.json")
+        self.high_water = None
+        self.case_ids = set()
+        self.exported_at = None
+    
+    def load(self) -> bool:
+        """
+        Загрузка снимка предыдущего экспорта
+        
+        Returns:
+            True если снимок найден
+        """
+        if not os.path.exists(self.state_path):
+            return False
+        
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as state_file:
+                state = json.load(state_file)
+            self.high_water = state.get('high_water')
+            self.case_ids = set(state.get('case_ids', []))
+            self.exported_at = state.get('exported_at')
+            return True
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Не удалось прочитать снимок экспорта {self.state_path}: {e}")
+            return False
+    
+    def diff(self, listed_cases: List[Dict]) -> tuple[set, set, set]:
+        """
+        Сравнение текущего списка тест-кейсов со снимком
+        
+        Args:
+            listed_cases: Тест-кейсы из /home/{projectId} (с полями id и updatedAt)
+            
+        Returns:
+            Кортеж множеств ID (созданные, измененные, удаленные)
+        """
+        current_ids = {case['id'] for case in listed_cases}
+        created = current_ids - self.case_ids
+        updated = {
+            case['id'] for case in listed_cases
+            if case['id'] in self.case_ids
+            and (not case.get('updatedAt') or not self.high_water or case['updatedAt'] > self.high_water)
+        }
+        deleted = self.case_ids - current_ids
+        return created, updated, deleted
+    
+    def save(self, listed_cases: List[Dict]) -> None:
+        """Сохранение снимка по текущему списку тест-кейсов проекта"""
+        updated_values = [case['updatedAt'] for case in listed_cases if case.get('updatedAt')]
+        self.high_water = max(updated_values) if updated_values else None
+        self.case_ids = {case['id'] for case in listed_cases}
+        self.exported_at = datetime.now().isoformat(timespec='seconds')
+        
+        state = {
+            'project_id': self.project_id,
+            'high_water': self.high_water,
+            'case_ids': sorted(self.case_ids),
+            'exported_at': self.exported_at
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file)
+        os.replace(tmp_path, self.state_path)
+
+class ProjectSnapshot:
+    """
+    Снимок структуры проекта для экрана информации о проектах
+    
+    Хранит только сводку (папки и количество тест-кейсов в них), а не сами кейсы.
+    Снимок, сделанный не раньше чем ttl секунд назад, используется вместо запроса
+    /home/{projectId}.
+    """
+    
+    def __init__(self, project_id: int, directory: str = "./"):
+        self.project_id = project_id
+        self.snapshot_path = os.path.join(directory, f".tms_info_{project_id}.json")
+    
+    def load(self, ttl: float) -> Optional[Dict]:
+        """
+        Загрузка снимка, если он не старше ttl секунд
+        
+        Returns:
+            Сводка проекта (folders, taken_at) или None
+        """
+        if ttl <= 0 or not os.path.exists(self.snapshot_path):
+            return None
+        
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as snapshot_file:
+                summary = json.load(snapshot_file)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Не удалось прочитать снимок проекта {self.snapshot_path}: {e}")
+            return None
+        
+        if time.time() - summary.get('taken_at', 0) > ttl:
+            return None
+        return summary
+    
+    def save(self, summary: Dict) -> None:
+        """Сохранение сводки проекта"""
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(summary, snapshot_file, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+class ImportJournal:
+    """
+    Журнал импорта созданных тест-кейсов
+    
+    Хранит соответствие отпечатка тест-кейса из CSV и ID созданного кейса, а также
+    признак того, что его шаги еще не отправлены. Журнал дописывается по мере импорта
+    в формате JSON Lines, поэтому повторный запуск того же CSV в тот же проект
+    пропускает уже созданные кейсы и лишь повторяет недостающие обновления шагов.
+    """
+    
+    def __init__(self, project_id: int, csv_path: str, directory: str = "./"):
+        csv_hash = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:10]
+        self.journal_path = os.path.join(directory, f".tms_import_{project_id}_{csv_hash}.journal")
+        self.entries = {}
+        self._occurrences = {}
+        self._lock = threading.Lock()
+        self._journal_file = None
+    
+    def load(self) -> int:
+        """
+        Загрузка журнала предыдущих запусков
+        
+        Returns:
+            Количество уже созданных тест-кейсов
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+        
+        with open(self.journal_path, 'r', encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Последняя строка могла быть записана не полностью
+                    break
+                self.entries.setdefault(entry['fp'], {}).update(
+                    {key: value for key, value in entry.items() if key != 'fp'}
+                )
+        return len(self.entries)
+    
+    def fingerprint(self, test_case: Dict) -> str:
+        """
+        Отпечаток тест-кейса из CSV
+        
+        Одинаковые кейсы различаются порядковым номером повторения, поэтому при
+        одинаковом порядке вызовов отпечатки совпадают между запусками.
+        """
+        content = json.dumps(test_case, sort_keys=True, ensure_ascii=False)
+        content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        occurrence = self._occurrences.get(content_hash, 0)
+        self._occurrences[content_hash] = occurrence + 1
+        return f"{content_hash}:{occurrence}"
+    
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """Запись журнала для отпечатка или None, если кейс еще не создавался"""
+        with self._lock:
+            return self.entries.get(fingerprint)
+    
+    def record_created(self, fingerprint: str, case_id: int, steps_pending: bool) -> None:
+        """Запись о созданном тест-кейсе"""
+        self._write({'fp': fingerprint, 'case_id': case_id, 'steps_pending': steps_pending})
+    
+    def record_steps_updated(self, fingerprint: str) -> None:
+        """Запись об успешном обновлении шагов тест-кейса"""
+        self._write({'fp': fingerprint, 'steps_pending': False})
+    
+    def _write(self, entry: Dict) -> None:
+        with self._lock:
+            self.entries.setdefault(entry['fp'], {}).update(
+                {key: value for key, value in entry.items() if key != 'fp'}
+            )
+            if self._journal_file is None:
+                self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal_file.write(json.dumps(entry) + '\n')
+            self._journal_file.flush()
+    
+    def close(self) -> None:
+        """Закрытие файла журнала"""
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
 class TMSTool:
     """Основной класс инструмента TMS"""
     
     def __init__(self):
         self.client = None
         self.csv_handler = CSVHandler()
+        self.jsonl_handler = JSONLHandler()
+        self.file_format = None
+        self.source_project_id = None
+        self.preserve_order = False
         self.folder_manager = None
+        self.import_journal = None
+        self.interactive = True
+        self.max_workers = max(1, env_int('TMS_MAX_WORKERS', 1))
+        self.case_cache_path = os.getenv('TMS_CASE_CACHE', '').strip()
+        self.metrics_file = os.getenv('TMS_METRICS_FILE', '').strip()
+        self.info_cache_ttl = max(0.0, env_float('TMS_INFO_CACHE_TTL', 0.0))
         
     def setup_client(self) -> bool:
         """Настройка клиента TMS"""
@@ -499,7 +2039,10 @@ class TMSTool:
             print("❌ Ошибка: Не заданы параметры подключения в .env файле")
             return False
         
-        self.client = TMSClient(base_url, email, password)
+        retry_policy = RetryPolicy(max_retries=max(0, env_int('TMS_MAX_RETRIES', RetryPolicy.max_retries)))
+        timeout = (env_float('TMS_CONNECT_TIMEOUT', 10.0), env_float('TMS_READ_TIMEOUT', 60.0))
+        self.client = TMSClient(base_url, email, password, max_concurrency=self.max_workers,
+                                retry_policy=retry_policy, timeout=timeout)
         if self.client.authenticate():
             self.folder_manager = FolderManager(self.client)
             return True
@@ -513,6 +2056,8 @@ class TMSTool:
         print("1️⃣  Экспорт тест-кейсов в CSV")
         print("2️⃣  Импорт тест-кейсов из CSV")
         print("3️⃣  Просмотр информации о проектах")
+        print("4️⃣  Инкрементальный экспорт (изменения с прошлого экспорта)")
+        print("5️⃣  Экспорт нескольких проектов")
         print("0️⃣  Выход")
         print("="*60)
     
@@ -543,13 +2088,37 @@ class TMSTool:
             except ValueError:
                 print("❌ Введите корректный номер")
     
-    def export_test_cases(self):
-        """Экспорт тест-кейсов"""
+    def export_test_cases(self, project: Optional[Dict] = None, resume: Optional[bool] = None,
+                          output: Optional[str] = None) -> int:
+        """
+        Экспорт тест-кейсов
+        
+        Args:
+            project: Проект для экспорта (если не указан - выбирается интерактивно)
+            resume: Продолжить незавершенный экспорт (если не указано - спросить)
+            output: Путь к CSV файлу (по умолчанию формируется из имени проекта и времени)
+            
+        Returns:
+            Код завершения EXIT_*
+        """
         print("\n🔄 Экспорт тест-кейсов в CSV")
+        self.client.reset_stats()
         
-        project = self.select_project()
+        project = project or self.select_project()
         if not project:
-            return
+            return EXIT_NOT_FOUND
+        
+        # Проверяем, нет ли незавершенного экспорта этого проекта
+        journal = ExportJournal(project['id'])
+        has_journal = journal.load()
+        if has_journal and resume is None:
+            print(f"\n⚠️ Найден незавершенный экспорт: {journal.file_path} ({len(journal.done_ids)} тест-кейсов)")
+            resume = input("Продолжить его? (y/n) [y]: ").strip().lower() in ('', 'y', 'yes', 'д', 'да')
+        elif resume and not has_journal:
+            print("ℹ️ Незавершенный экспорт не найден, выполняется полный экспорт")
+        resume = bool(resume and has_journal)
+        if not resume:
+            journal = ExportJournal(project['id'])
         
         print(f"\n📥 Загрузка тест-кейсов из проекта '{project['name']}'...")
         
@@ -558,188 +2127,728 @@ class TMSTool:
         
         if not project_data:
             print("❌ Не удалось загрузить данные проекта")
-            return
+            return EXIT_ERROR
         
-        # Получаем все тест-кейсы с детализацией
-        cases = self.client.get_all_cases_detailed(project_data)
+        # Считаем тест-кейсы по структуре проекта, детали загружаются потоково при записи
+        listed_ids = {case['id'] for folder in project_data.get('Folders', []) for case in folder.get('Cases', [])}
         
-        if not cases:
+        if not listed_ids:
             print("❌ В проекте нет тест-кейсов")
-            return
+            return EXIT_OK
+        
+        print(f"📋 Найдено {len(listed_ids)} тест-кейсов")
+        
+        if resume:
+            file_path = journal.file_path
+            print(f"⏩ Пропускаем {len(journal.done_ids & listed_ids)} уже экспортированных тест-кейсов")
+        elif output:
+            file_path = output
+        else:
+            # Формируем имя файла
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"testcases_export_{project['name']}_{timestamp}.{self.file_format or 'csv'}"
+            file_path = os.path.join(os.path.expanduser("./"), filename)
         
-        print(f"📋 Найдено {len(cases)} тест-кейсов")
+        # Экспортируем в CSV, загружая детали тест-кейсов по мере записи
+        case_cache = self._open_case_cache()
+        cases = self.client.iter_cases_detailed(
+            project_data, self.max_workers, exclude_ids=set(journal.done_ids), cache=case_cache
+        )
+        exported = self._write_cases(cases, file_path, journal, project=project, project_data=project_data)
+        journal.close()
         
-        # Формируем имя файла
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"testcases_export_{project['name']}_{timestamp}.csv"
-        file_path = os.path.join(os.path.expanduser("./"), filename)
+        if case_cache:
+            print(f"📦 Кэш тест-кейсов: {case_cache.stats_report()}")
+            case_cache.close()
+        self._report_transport()
         
-        # Экспортируем в CSV
-        if self.csv_handler.export_to_csv(cases, file_path):
+        missing_count = len(listed_ids - journal.done_ids)
+        if exported and not missing_count:
+            journal.remove()
+            # Полный экспорт становится базой для следующего инкрементального
+            ExportState(project['id']).save(self._listed_cases(project_data))
             print(f"✅ Экспорт завершен успешно!")
             print(f"📄 Файл сохранен: {file_path}")
+            return EXIT_OK
+        elif exported:
+            print(f"⚠️ Экспорт завершен, но {missing_count} тест-кейсов не загружено")
+            print(f"📄 Файл сохранен: {file_path}")
+            print("🔁 Повторите экспорт проекта, чтобы догрузить недостающие тест-кейсы")
+            return EXIT_PARTIAL
+        else:
+            print("❌ Ошибка при экспорте")
+            print("🔁 Повторите экспорт проекта, чтобы продолжить с места остановки")
+            return EXIT_ERROR
+    
+    def export_delta(self, project: Optional[Dict] = None, output: Optional[str] = None) -> int:
+        """
+        Инкрементальный экспорт: только тест-кейсы, измененные с прошлого экспорта
+        
+        Args:
+            project: Проект для экспорта (если не указан - выбирается интерактивно)
+            output: Путь к CSV файлу изменений (список удаленных пишется рядом)
+            
+        Returns:
+            Код завершения EXIT_*
+        """
+        print("\n🔄 Инкрементальный экспорт тест-кейсов в CSV")
+        self.client.reset_stats()
+        
+        project = project or self.select_project()
+        if not project:
+            return EXIT_NOT_FOUND
+        
+        state = ExportState(project['id'])
+        if state.load():
+            print(f"ℹ️ Предыдущий экспорт: {state.exported_at}, тест-кейсов: {len(state.case_ids)}")
+        else:
+            print("ℹ️ Снимок предыдущего экспорта не найден, все тест-кейсы будут считаться новыми")
+        
+        project_data = self.client.get_project_with_cases(project['id'])
+        if not project_data:
+            print("❌ Не удалось загрузить данные проекта")
+            return EXIT_ERROR
+        
+        listed_cases = self._listed_cases(project_data)
+        created, updated, deleted = state.diff(listed_cases)
+        print(f"📋 Новых: {len(created)}, измененных: {len(updated)}, удаленных: {len(deleted)}")
+        
+        if output:
+            extension = data_file_extension(output)
+            base_path = output[:-len(extension)] if extension else output
         else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            base_path = os.path.join(os.path.expanduser("./"), f"testcases_delta_{project['name']}_{timestamp}")
+        file_path = output or f"{base_path}.{self.file_format or 'csv'}"
+        deleted_path = f"{base_path}_deleted.txt"
+        
+        # Загружаем детали только для новых и измененных тест-кейсов
+        changed_ids = created | updated
+        changed_data = {
+            'Folders': [
+                dict(folder, Cases=[case for case in folder.get('Cases', []) if case['id'] in changed_ids])
+                for folder in project_data.get('Folders', [])
+            ]
+        }
+        case_cache = self._open_case_cache()
+        exported_ids = set()
+        
+        def track(cases: Iterable[Dict]) -> Iterator[Dict]:
+            for case in cases:
+                exported_ids.add(case['id'])
+                yield case
+        
+        cases = self.client.iter_cases_detailed(changed_data, self.max_workers, cache=case_cache)
+        exported = self._write_cases(
+            track(cases), file_path, project=project, project_data=project_data, deleted_ids=deleted
+        )
+        if case_cache:
+            print(f"📦 Кэш тест-кейсов: {case_cache.stats_report()}")
+            case_cache.close()
+        self._report_transport()
+        
+        if not exported:
             print("❌ Ошибка при экспорте")
+            return EXIT_ERROR
+        
+        with open(deleted_path, 'w', encoding='utf-8') as deleted_file:
+            deleted_file.writelines(f"{case_id}\n" for case_id in sorted(deleted))
+        
+        missing_count = len(changed_ids - exported_ids)
+        if missing_count:
+            # Снимок не обновляем, чтобы следующий запуск повторил незагруженные кейсы
+            print(f"⚠️ {missing_count} тест-кейсов не загружено, снимок экспорта не обновлен")
+        else:
+            state.save(listed_cases)
+            print(f"✅ Инкрементальный экспорт завершен успешно!")
+        print(f"📄 Измененные тест-кейсы: {file_path}")
+        print(f"🗑️ Удаленные тест-кейсы: {deleted_path}")
+        return EXIT_PARTIAL if missing_count else EXIT_OK
+    
+    def export_projects(self, projects: List[Dict], output_dir: Optional[str] = None,
+                        parallel_projects: Optional[int] = None, compression: Optional[str] = None) -> int:
+        """
+        Параллельный экспорт нескольких проектов: один CSV на проект и manifest.json
+        
+        Проекты выгружаются одновременно, но все запросы идут через общий клиент,
+        поэтому суммарная нагрузка на TMS ограничена TMS_MAX_WORKERS, а не умножается
+        на число проектов.
+        
+        Args:
+            projects: Проекты для экспорта
+            output_dir: Каталог для файлов (по умолчанию ./export_<время>)
+            parallel_projects: Число одновременно выгружаемых проектов (по умолчанию до 4)
+            compression: Сжатие файлов проектов: 'gz', 'zst' или None
+            
+        Returns:
+            Код завершения EXIT_*
+        """
+        print(f"\n🔄 Экспорт {len(projects)} проектов в CSV")
+        self.client.reset_stats()
+        
+        if not projects:
+            print("❌ Нет проектов для экспорта")
+            return EXIT_NOT_FOUND
+        
+        started_at = datetime.now()
+        output_dir = output_dir or os.path.join(".", f"export_{started_at.strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(output_dir, exist_ok=True)
+        parallel_projects = max(1, parallel_projects or min(4, len(projects)))
+        print(f"📂 Каталог: {output_dir} (одновременно проектов: {parallel_projects}, запросов: {self.max_workers})")
+        
+        case_cache = self._open_case_cache()
+        started = time.perf_counter()
+        entries = []
+        for entry in ordered_parallel_map(
+            lambda project: self._export_project_file(project, output_dir, case_cache, compression),
+            projects,
+            parallel_projects
+        ):
+            entries.append(entry)
+            size_mb = entry['bytes'] / (1024 * 1024)
+            if entry['status'] == 'ok':
+                print(f"  ✓ {entry['name']} (ID: {entry['project_id']}): {entry['cases_exported']} тест-кейсов, "
+                      f"{size_mb:.1f} MB, {entry['seconds']:.1f} с")
+            elif entry['status'] == 'partial':
+                print(f"  ⚠️ {entry['name']} (ID: {entry['project_id']}): выгружено {entry['cases_exported']} "
+                      f"из {entry['cases_listed']} тест-кейсов")
+            else:
+                print(f"  ❌ {entry['name']} (ID: {entry['project_id']}): ошибка экспорта")
+        
+        if case_cache:
+            print(f"📦 Кэш тест-кейсов: {case_cache.stats_report()}")
+            case_cache.close()
+        
+        manifest = {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - started, 3),
+            'max_workers': self.max_workers,
+            'parallel_projects': parallel_projects,
+            'totals': {
+                'projects': len(entries),
+                'failed': sum(1 for entry in entries if entry['status'] != 'ok'),
+                'cases': sum(entry['cases_exported'] for entry in entries),
+                'bytes': sum(entry['bytes'] for entry in entries),
+            },
+            'projects': entries,
+        }
+        manifest_path = os.path.join(output_dir, 'manifest.json')
+        with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, ensure_ascii=False, indent=2)
+        self._report_transport()
+        
+        totals = manifest['totals']
+        print(f"\n✅ Экспортировано {totals['cases']} тест-кейсов из {totals['projects']} проектов "
+              f"за {manifest['seconds']:.1f} с")
+        print(f"📄 Манифест: {manifest_path}")
+        if totals['failed'] == totals['projects']:
+            return EXIT_ERROR
+        if totals['failed']:
+            print(f"⚠️ Не полностью выгружено проектов: {totals['failed']}")
+            return EXIT_PARTIAL
+        return EXIT_OK
     
-    def import_test_cases(self):
-        """Импорт тест-кейсов с автоматическим распределением по папкам"""
+    def _export_project_file(self, project: Dict, output_dir: str, case_cache: Optional[CaseCache],
+                             compression: Optional[str] = None) -> Dict:
+        """
+        Экспорт одного проекта для export_projects
+        
+        Returns:
+            Запись манифеста: файл, количество кейсов, размер, длительность и статус
+        """
+        started = time.perf_counter()
+        safe_name = re.sub(r'[^\w\-]+', '_', project['name']).strip('_')
+        extension = f".{self.file_format or 'csv'}" + (f".{compression}" if compression else "")
+        file_path = os.path.join(output_dir, f"project_{project['id']}_{safe_name}{extension}")
+        entry = {
+            'project_id': project['id'],
+            'name': project['name'],
+            'file': os.path.basename(file_path),
+            'cases_listed': 0,
+            'cases_exported': 0,
+            'bytes': 0,
+            'seconds': 0.0,
+            'status': 'error',
+        }
+        
+        project_data = self.client.get_project_with_cases(project['id'])
+        if project_data:
+            entry['cases_listed'] = sum(len(folder.get('Cases', [])) for folder in project_data.get('Folders', []))
+            
+            def counted(cases: Iterator[Dict]) -> Iterator[Dict]:
+                for case in cases:
+                    entry['cases_exported'] += 1
+                    yield case
+            
+            cases = self.client.iter_cases_detailed(project_data, self.max_workers, cache=case_cache)
+            if self._write_cases(counted(cases), file_path, project=project, project_data=project_data):
+                entry['bytes'] = os.path.getsize(file_path)
+                if entry['cases_exported'] == entry['cases_listed']:
+                    entry['status'] = 'ok'
+                    # Полный экспорт становится базой для следующего инкрементального
+                    ExportState(project['id']).save(self._listed_cases(project_data))
+                else:
+                    entry['status'] = 'partial'
+        
+        entry['seconds'] = round(time.perf_counter() - started, 3)
+        return entry
+    
+    def _write_cases(self, cases: Iterable[Dict], file_path: str, journal: Optional[ExportJournal] = None,
+                     project: Optional[Dict] = None, project_data: Optional[Dict] = None,
+                     deleted_ids: Optional[set] = None) -> bool:
+        """
+        Запись тест-кейсов в файл в формате --format или по расширению файла
+        
+        project и project_data нужны снимку SQLite (проект и папки), deleted_ids -
+        для инкрементального экспорта в снимок: изменения дополняют его вместо замены.
+        """
+        file_format = self.file_format or detect_file_format(file_path)
+        if file_format == 'sqlite':
+            return SnapshotStore.export_to_sqlite(cases, file_path, project, project_data, journal, deleted_ids)
+        if file_format == 'jsonl':
+            return self.jsonl_handler.export_to_jsonl(cases, file_path, journal)
+        return self.csv_handler.export_to_csv(cases, file_path, journal)
+    
+    def _iter_cases(self, file_path: str) -> Iterator[tuple[str, Dict]]:
+        """
+        Потоковое чтение пар (ключ папки, тест-кейс) из файла в формате --format или по расширению
+        
+        Ошибки чтения и разбора пробрасываются вызывающему коду.
+        """
+        file_format = self.file_format or detect_file_format(file_path)
+        if file_format == 'sqlite':
+            return SnapshotStore.iter_cases_from_sqlite(file_path, self.source_project_id)
+        if file_format == 'jsonl':
+            return self.jsonl_handler.iter_cases_from_jsonl(file_path)
+        return self.csv_handler.iter_cases_from_csv(file_path)
+    
+    def _count_cases_by_folder(self, file_path: str) -> Optional[Dict[str, int]]:
+        """
+        Первый проход по файлу импорта: количество тест-кейсов в каждой группе папки
+        
+        Сами тест-кейсы не сохраняются, поэтому память не зависит от размера файла.
+        
+        Returns:
+            Словарь ключ папки -> количество кейсов в порядке первого появления,
+            или None, если файл не удалось прочитать
+        """
+        folder_counts = {}
+        try:
+            for folder_key, _ in self._iter_cases(file_path):
+                folder_counts[folder_key] = folder_counts.get(folder_key, 0) + 1
+        except Exception as e:
+            logger.error(f"✗ Ошибка чтения файла {file_path}: {e}")
+            return None
+        
+        logger.info(f"✓ Найдено {sum(folder_counts.values())} тест-кейсов в {file_path}")
+        logger.info(f"ℹ️ Распределение по папкам: {folder_counts}")
+        return folder_counts
+    
+    def _report_transport(self):
+        """Вывод статистики запросов и соединений с TMS, сохранение метрик в JSON"""
+        metrics = self.client.metrics
+        if metrics.endpoints:
+            print("\n📈 Статистика запросов к TMS:")
+            print(metrics.format_table())
+        
+        stats = self.client.connection_stats()
+        if stats['requests']:
+            print(f"🔌 Соединения: {stats['connections']} открыто на {stats['requests']} запросов "
+                  f"(переиспользовано {stats['reuse_ratio'] * 100:.1f}%)")
+        
+        if self.metrics_file:
+            try:
+                metrics.write_json(self.metrics_file, {'connections': stats})
+                print(f"📄 Метрики сохранены: {self.metrics_file}")
+            except OSError as e:
+                logger.error(f"✗ Ошибка сохранения метрик в {self.metrics_file}: {e}")
+    
+    @staticmethod
+    def _listed_cases(project_data: Dict) -> List[Dict]:
+        """Все тест-кейсы из структуры проекта /home/{projectId} без деталей"""
+        return [case for folder in project_data.get('Folders', []) for case in folder.get('Cases', [])]
+    
+    def _open_case_cache(self) -> Optional[CaseCache]:
+        """Открытие локального кэша тест-кейсов, если он включен через TMS_CASE_CACHE"""
+        if not self.case_cache_path:
+            return None
+        
+        try:
+            case_cache = CaseCache(
+                self.case_cache_path,
+                max_age_days=env_int('TMS_CASE_CACHE_MAX_AGE_DAYS', 30),
+                max_entries=env_int('TMS_CASE_CACHE_MAX_ENTRIES', 200000)
+            )
+            removed = case_cache.evict()
+            if removed:
+                logger.info(f"ℹ️ Из кэша тест-кейсов удалено {removed} устаревших записей")
+            return case_cache
+        except Exception as e:
+            logger.warning(f"⚠️ Кэш тест-кейсов недоступен ({self.case_cache_path}): {e}")
+            return None
+    
+    def import_test_cases(self, project: Optional[Dict] = None, file_path: Optional[str] = None,
+                          default_folder_spec: Optional[str] = None) -> int:
+        """
+        Импорт тест-кейсов с автоматическим распределением по папкам
+        
+        Args:
+            project: Проект для импорта (если не указан - выбирается интерактивно)
+            file_path: Путь к CSV файлу (если не указан - запрашивается)
+            default_folder_spec: ID или имя папки для нераспределенных тест-кейсов
+                (если не указана - выбирается интерактивно)
+            
+        Returns:
+            Код завершения EXIT_*
+        """
         print("\n🔄 Импорт тест-кейсов из CSV")
+        self.client.reset_stats()
         
-        project = self.select_project()
+        project = project or self.select_project()
         if not project:
-            return
+            return EXIT_NOT_FOUND
         
         # Запрашиваем путь к файлу
-        file_path = input("\n📁 Введите путь к CSV файлу: ").strip()
+        if file_path is None:
+            file_path = input("\n📁 Введите путь к CSV файлу: ").strip()
         
         if not os.path.exists(file_path):
             print("❌ Файл не найден")
-            return
+            return EXIT_NOT_FOUND
         
-        # Загружаем тест-кейсы из CSV, сгруппированные по папкам
-        cases_by_folder = self.csv_handler.import_from_csv(file_path)
-        if not cases_by_folder:
-            return
+        # Первый проход: только ключи папок и количество кейсов, сами кейсы читаются при импорте
+        folder_counts = self._count_cases_by_folder(file_path)
+        if not folder_counts:
+            return EXIT_ERROR
+        
+        # Индекс папок проекта строится одним запросом на весь импорт
+        try:
+            self.folder_manager.load(project['id'], refresh=True)
+        except RuntimeError as e:
+            print(f"❌ Импорт отменен: {e}")
+            return EXIT_CONNECTION
+        
+        # Журнал импорта позволяет безопасно перезапускать импорт этого файла
+        self.import_journal = ImportJournal(project['id'], file_path)
+        imported_before = self.import_journal.load()
+        if imported_before:
+            print(f"\n⏩ Найден журнал предыдущего импорта этого файла: {imported_before} тест-кейсов уже создано")
+            print(f"   Они будут пропущены. Чтобы импортировать файл заново, удалите {self.import_journal.journal_path}")
         
         # Показываем статистику
         print(f"\n📊 Статистика импорта:")
-        for folder_key, cases in cases_by_folder.items():
+        for folder_key, count in folder_counts.items():
             if folder_key == 'unassigned':
-                print(f"  📂 Нераспределенные тест-кейсы: {len(cases)}")
+                print(f"  📂 Нераспределенные тест-кейсы: {count}")
             else:
-                folder_name = folder_key.split('|')[0]
-                print(f"  📁 {folder_name}: {len(cases)} тест-кейсов")
+                folder_name = folder_key.rsplit('|', 1)[0]
+                print(f"  📁 {folder_name}: {count} тест-кейсов")
         
         # Обработка нераспределенных тест-кейсов
         default_folder = None
-        if 'unassigned' in cases_by_folder:
-            print(f"\n⚠️ Найдено {len(cases_by_folder['unassigned'])} нераспределенных тест-кейсов")
-            default_folder = self.select_or_create_folder(project['id'], "для нераспределенных тест-кейсов")
+        if 'unassigned' in folder_counts:
+            print(f"\n⚠️ Найдено {folder_counts['unassigned']} нераспределенных тест-кейсов")
+            if default_folder_spec:
+                default_folder = self._resolve_folder_spec(project['id'], default_folder_spec)
+            elif self.interactive:
+                default_folder = self.select_or_create_folder(project['id'], "для нераспределенных тест-кейсов")
+            else:
+                print("❌ Не указана папка для нераспределенных кейсов (--default-folder)")
+                return EXIT_USAGE
             if not default_folder:
                 print("❌ Не удалось выбрать папку для нераспределенных кейсов")
-                return
+                return EXIT_NOT_FOUND
+        
+        # Планирование: папки всех групп находятся или создаются до импорта кейсов
+        target_folders = self._plan_folders(project['id'], folder_counts, default_folder)
         
-        # Импортируем тест-кейсы по группам
-        total_success = 0
         total_errors = 0
+        for folder_key, count in folder_counts.items():
+            if not target_folders.get(folder_key):
+                print(f"❌ Не удалось получить папку '{folder_key.rsplit('|', 1)[0]}', пропускаем {count} тест-кейсов")
+                total_errors += count
         
-        for folder_key, test_cases in cases_by_folder.items():
-            if folder_key == 'unassigned':
-                # Используем выбранную папку для нераспределенных
-                target_folder = default_folder
-                print(f"\n📤 Импорт {len(test_cases)} нераспределенных тест-кейсов в папку '{target_folder['name']}'...")
-            else:
-                # Обрабатываем тест-кейсы с указанной папкой
-                folder_name, folder_id_str = folder_key.split('|')
-                folder_id = int(folder_id_str) if folder_id_str != 'None' and folder_id_str.isdigit() else None
-                
-                if folder_id:
-                    # Валидируем существующую папку
-                    target_folder = self.folder_manager.validate_and_get_folder(
-                        project['id'], folder_id, folder_name
-                    )
-                else:
-                    # Создаем папку только по имени
-                    print(f"\n🔍 Поиск или создание папки '{folder_name}'...")
-                    folders_map = self.folder_manager.get_all_folders_map(project['id'])
-                    
-                    if folder_name in folders_map:
-                        target_folder = folders_map[folder_name]
-                        print(f"✓ Найдена существующая папка: {folder_name}")
-                    else:
-                        target_folder = self.client.create_folder(project['id'], folder_name, "Автоматически создана при импорте")
-                        if target_folder:
-                            print(f"✓ Создана новая папка: {folder_name}")
-                
-                if not target_folder:
-                    print(f"❌ Не удалось получить папку '{folder_name}', пропускаем {len(test_cases)} тест-кейсов")
-                    total_errors += len(test_cases)
-                    continue
-                
-                print(f"\n📤 Импорт {len(test_cases)} тест-кейсов в папку '{target_folder['name']}'...")
-            
-            # Импортируем тест-кейсы в целевую папку
-            success_count, error_count = self._import_cases_to_folder(test_cases, target_folder)
-            total_success += success_count
+        # Второй проход: тест-кейсы читаются из файла и создаются одним параллельным потоком
+        try:
+            total_success, error_count = self._import_cases_to_folders(
+                self._iter_cases(file_path), target_folders, folder_counts
+            )
             total_errors += error_count
+        except Exception as e:
+            logger.error(f"✗ Ошибка чтения файла {file_path}: {e}")
+            self.import_journal.close()
+            print("❌ Импорт прерван, повторите его: уже созданные тест-кейсы будут пропущены")
+            return EXIT_ERROR
+        
+        self.import_journal.close()
+        self._report_transport()
         
         # Итоговая статистика
         print(f"\n✅ Импорт завершен!")
         print(f"✓ Успешно импортировано: {total_success}")
         if total_errors > 0:
             print(f"❌ Ошибок: {total_errors}")
+            return EXIT_PARTIAL
+        return EXIT_OK
+    
+    def _plan_folders(self, project_id: int, folder_keys: Iterable[str],
+                      default_folder: Optional[Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Сопоставление групп CSV с папками проекта и параллельное создание недостающих
+        
+        Args:
+            project_id: ID проекта
+            folder_keys: Ключи групп 'путь|id' папок (или 'unassigned')
+            default_folder: Папка для нераспределенных тест-кейсов
+            
+        Returns:
+            Словарь ключ группы -> папка (None, если папку получить не удалось)
+        """
+        target_folders = {}
+        missing = {}
+        for folder_key in folder_keys:
+            if folder_key == 'unassigned':
+                target_folders[folder_key] = default_folder
+                continue
+            folder_path, folder_id_str = folder_key.rsplit('|', 1)
+            folder_id = int(folder_id_str) if folder_id_str.isdigit() else None
+            path = tuple(split_folder_path(folder_path))
+            existing_folder = self.folder_manager.find_existing(project_id, folder_id, path, folder_path)
+            if existing_folder:
+                target_folders[folder_key] = existing_folder
+            else:
+                missing[folder_key] = path
+        
+        print(f"\n🗂 Папки: {len(target_folders)} найдено, {len(set(missing.values()))} будет создано")
+        created = self.folder_manager.ensure_folders(
+            project_id, missing.values(), "Автоматически создана при импорте", self.max_workers
+        )
+        for path, folder in created.items():
+            if folder:
+                print(f"  ✓ Создана новая папка: {join_folder_path(path)} (ID: {folder['id']})")
+            else:
+                print(f"  ❌ Не удалось создать папку: {join_folder_path(path)}")
+        for folder_key, path in missing.items():
+            target_folders[folder_key] = created[path]
+        return target_folders
+    
+    def _resolve_folder_spec(self, project_id: int, folder_spec: str) -> Optional[Dict]:
+        """
+        Поиск папки по ID, имени или пути без интерактивных запросов
+        
+        Args:
+            project_id: ID проекта
+            folder_spec: ID папки, ее имя или путь 'Родитель/Папка' (недостающие папки создаются)
+            
+        Returns:
+            Словарь с информацией о папке или None, если папка с указанным ID не найдена
+        """
+        if folder_spec.isdigit():
+            folder = self.folder_manager.get_by_id(project_id, int(folder_spec))
+            if folder:
+                print(f"✓ Выбрана папка: {folder['name']}")
+            else:
+                print(f"❌ Папка с ID {folder_spec} не найдена")
+            return folder
+        
+        path = tuple(split_folder_path(folder_spec))
+        if len(path) > 1:
+            # Путь вида 'Родитель/Папка' - недостающие папки создаются по уровням
+            created = self.folder_manager.find_by_path(project_id, path) is None
+            folder = self.folder_manager.ensure_folders(
+                project_id, [path], "Автоматически создана для нераспределенных тест-кейсов", self.max_workers
+            )[path]
+        else:
+            folder, created = self.folder_manager.get_or_create_by_name(
+                project_id, path[0] if path else folder_spec, "Автоматически создана для нераспределенных тест-кейсов"
+            )
+        if folder:
+            print(f"✓ {'Создана новая' if created else 'Выбрана'} папка: {folder_spec}")
+        return folder
     
-    def _import_cases_to_folder(self, test_cases: List[Dict], target_folder: Dict) -> tuple[int, int]:
+    def _import_cases_to_folders(self, pairs: Iterable[tuple[str, Dict]], target_folders: Dict[str, Optional[Dict]],
+                                 folder_counts: Dict[str, int]) -> tuple[int, int]:
         """
-        Импорт списка тест-кейсов в указанную папку
+        Импорт потока тест-кейсов в заранее подготовленные папки
+        
+        Тест-кейсы читаются из pairs по мере импорта (вперед забирается не более
+        2 * self.max_workers), создаются параллельно (не более self.max_workers
+        одновременно), шаги каждого кейса отправляются сразу после его создания.
+        Отчет по кейсам выводится в порядке файла.
+        
+        С self.preserve_order кейсы одной папки создаются строго по порядку файла (их ID
+        в TMS идут в том же порядке): создание кейса ждет создания предыдущего кейса
+        этой папки, а шаги и кейсы других папок по-прежнему отправляются параллельно.
         
         Args:
-            test_cases: Список тест-кейсов для импорта
-            target_folder: Целевая папка
+            pairs: Пары (ключ папки, тест-кейс) в порядке файла
+            target_folders: Папки групп из _plan_folders (кейсы групп без папки пропускаются)
+            folder_counts: Количество кейсов в группах для отчета
             
         Returns:
             Кортеж (количество_успешных, количество_ошибок)
         """
         success_count = 0
         error_count = 0
+        last_created = {}
         
-        for i, test_case in enumerate(test_cases, 1):
-            # Подготавливаем основные данные для создания
-            case_data = {
-                'title': test_case['title'],
-                'state': test_case['state'],
-                'priority': test_case['priority'],
-                'type': test_case['type'],
-                'automationStatus': test_case['automationStatus'],
-                'description': test_case['description'],
-                'template': test_case['template'],
-                'preConditions': test_case['preConditions'],
-                'expectedResults': test_case['expectedResults']
-            }
-            
-            # Сначала создаем тест-кейс без шагов
-            created_case = self.client.create_case(target_folder['id'], case_data)
-            
+        def prepare(pairs: Iterable[tuple[str, Dict]]) -> Iterator[tuple]:
+            # Отпечатки считаются в основном потоке по порядку файла, чтобы не зависеть от порядка потоков
+            for folder_key, test_case in pairs:
+                target_folder = target_folders.get(folder_key)
+                if not target_folder:
+                    continue
+                fingerprint = self.import_journal.fingerprint(test_case) if self.import_journal else None
+                created_event = threading.Event() if self.preserve_order else None
+                previous_event = last_created.get(target_folder['id']) if self.preserve_order else None
+                last_created[target_folder['id']] = created_event
+                yield folder_key, test_case, target_folder, fingerprint, previous_event, created_event
+        
+        results = ordered_parallel_map(
+            lambda item: (item[0], item[1], item[2], self._import_single_case(item[1], item[2]['id'], *item[3:])),
+            prepare(pairs),
+            self.max_workers
+        )
+        
+        current_key = None
+        folder_progress = {}
+        for folder_key, test_case, target_folder, (created_case, api_steps, steps_updated, resumed) in results:
+            if folder_key != current_key:
+                current_key = folder_key
+                print(f"\n📤 Импорт {folder_counts[folder_key]} тест-кейсов в папку '{target_folder['name']}'...")
+            folder_progress[folder_key] = folder_progress.get(folder_key, 0) + 1
+            progress = f"{folder_progress[folder_key]}/{folder_counts[folder_key]}"
             if not created_case:
-                print(f"  ❌ {i}/{len(test_cases)}: Ошибка создания {test_case['title']}")
+                print(f"  ❌ {progress}: Ошибка создания {test_case['title']}")
                 error_count += 1
-                continue
-            
-            # Если есть шаги и это пошаговый тест, обновляем его
-            if test_case['steps'] and test_case['template'] == 1:
-                # Подготавливаем шаги в формате для steps/update endpoint
-                api_steps = []
-                for j, step in enumerate(test_case['steps']):
-                    api_steps.append({
-                        'id': 0,  # Для новых шагов всегда 0
-                        'step': step['step'],
-                        'result': step['result'],
-                        'uid': f"uid{j}",  # Уникальный ID для каждого шага
-                        'editState': 'new',  # Обязательно для новых шагов
-                        'caseSteps': {
-                            'stepNo': step['stepNo']
-                        }
-                    })
-                
-                # Обновляем шаги через отдельный endpoint
-                updated_steps = self.client.update_case_steps(created_case['id'], api_steps)
-                
-                if updated_steps:
-                    print(f"  ✓ {i}/{len(test_cases)}: {test_case['title']} (с {len(api_steps)} шагами)")
-                    success_count += 1
-                else:
-                    print(f"  ⚠️ {i}/{len(test_cases)}: {test_case['title']} (создан, но шаги не добавлены)")
-                    success_count += 1  # Кейс все равно создан
+            elif resumed:
+                print(f"  ⏩ {progress}: {test_case['title']} (уже импортирован, ID: {created_case['id']})")
+                success_count += 1
+            elif api_steps and steps_updated:
+                print(f"  ✓ {progress}: {test_case['title']} (с {len(api_steps)} шагами)")
+                success_count += 1
+            elif api_steps:
+                print(f"  ⚠️ {progress}: {test_case['title']} (создан, но шаги не добавлены)")
+                success_count += 1  # Кейс все равно создан
             else:
                 # Простой тест-кейс без шагов
-                print(f"  ✓ {i}/{len(test_cases)}: {test_case['title']}")
+                print(f"  ✓ {progress}: {test_case['title']}")
                 success_count += 1
         
         return success_count, error_count
     
+    def _import_single_case(self, test_case: Dict, folder_id: int, fingerprint: Optional[str] = None,
+                            previous_event: Optional[threading.Event] = None,
+                            created_event: Optional[threading.Event] = None) -> tuple[Optional[Dict], List[Dict], bool, bool]:
+        """
+        Создание одного тест-кейса и обновление его шагов
+        
+        Args:
+            test_case: Тест-кейс из CSV
+            folder_id: ID целевой папки
+            fingerprint: Отпечаток тест-кейса в журнале импорта
+            previous_event: Событие создания предыдущего кейса папки (с --preserve-order)
+            created_event: Событие создания этого кейса для следующего кейса папки
+            
+        Returns:
+            Кортеж (созданный_кейс или None, отправленные_шаги, шаги_обновлены,
+            кейс_полностью_импортирован_ранее)
+        """
+        try:
+            if previous_event:
+                previous_event.wait()
+            created_case, steps_needed, resumed = self._create_import_case(test_case, folder_id, fingerprint)
+        finally:
+            if created_event:
+                created_event.set()
+        
+        if not steps_needed:
+            return created_case, [], False, resumed
+        api_steps, steps_updated = self._update_import_steps(test_case, created_case['id'], fingerprint)
+        return created_case, api_steps, steps_updated, False
+    
+    def _create_import_case(self, test_case: Dict, folder_id: int, fingerprint: Optional[str] = None) -> tuple[Optional[Dict], bool, bool]:
+        """
+        Создание одного тест-кейса без шагов
+        
+        Если кейс уже есть в журнале импорта, он не создается повторно.
+        
+        Args:
+            test_case: Тест-кейс из CSV
+            folder_id: ID целевой папки
+            fingerprint: Отпечаток тест-кейса в журнале импорта
+            
+        Returns:
+            Кортеж (созданный_кейс или None, нужно_обновить_шаги,
+            кейс_полностью_импортирован_ранее)
+        """
+        has_steps = bool(test_case['steps']) and test_case['template'] == 1
+        journal_entry = self.import_journal.get(fingerprint) if fingerprint else None
+        
+        if journal_entry:
+            # Кейс уже создан предыдущим запуском, при необходимости повторяем только шаги
+            created_case = {'id': journal_entry['case_id']}
+            steps_needed = has_steps and bool(journal_entry.get('steps_pending'))
+            return created_case, steps_needed, not steps_needed
+        
+        # Подготавливаем основные данные для создания
+        case_data = {
+            'title': test_case['title'],
+            'state': test_case['state'],
+            'priority': test_case['priority'],
+            'type': test_case['type'],
+            'automationStatus': test_case['automationStatus'],
+            'description': test_case['description'],
+            'template': test_case['template'],
+            'preConditions': test_case['preConditions'],
+            'expectedResults': test_case['expectedResults']
+        }
+        
+        # Сначала создаем тест-кейс без шагов
+        created_case = self.client.create_case(folder_id, case_data)
+        
+        if not created_case:
+            return None, False, False
+        
+        if fingerprint:
+            self.import_journal.record_created(fingerprint, created_case['id'], has_steps)
+        return created_case, has_steps, False
+    
+    def _update_import_steps(self, test_case: Dict, case_id: int, fingerprint: Optional[str] = None) -> tuple[List[Dict], bool]:
+        """
+        Обновление шагов созданного тест-кейса через отдельный endpoint
+        
+        Returns:
+            Кортеж (отправленные_шаги, шаги_обновлены)
+        """
+        api_steps = self._build_api_steps(test_case)
+        updated_steps = self.client.update_case_steps(case_id, api_steps)
+        
+        if updated_steps and fingerprint:
+            self.import_journal.record_steps_updated(fingerprint)
+        return api_steps, bool(updated_steps)
+    
+    @staticmethod
+    def _build_api_steps(test_case: Dict) -> List[Dict]:
+        """Подготовка шагов тест-кейса в формате для steps/update endpoint"""
+        api_steps = []
+        for j, step in enumerate(test_case['steps']):
+            api_steps.append({
+                'id': 0,  # Для новых шагов всегда 0
+                'step': step['step'],
+                'result': step['result'],
+                'uid': f"uid{j}",  # Уникальный ID для каждого шага
+                'editState': 'new',  # Обязательно для новых шагов
+                'caseSteps': {
+                    'stepNo': step['stepNo']
+                }
+            })
+        return api_steps
+    
     def select_or_create_folder(self, project_id: int, purpose: str = "") -> Optional[Dict]:
         """Выбор существующей папки или создание новой"""
-        folders = self.client.get_folders(project_id)
+        folders = self.folder_manager.folders(project_id)
         
         purpose_text = f" {purpose}" if purpose else ""
         print(f"\n📁 Выберите папку{purpose_text}:")
@@ -766,7 +2875,7 @@ class TMSTool:
                     if not folder_detail and purpose:
                         folder_detail = f"Автоматически создана {purpose}"
                     
-                    new_folder = self.client.create_folder(project_id, folder_name, folder_detail)
+                    new_folder = self.folder_manager.create_folder(project_id, folder_name, folder_detail)
                     if new_folder:
                         print(f"✓ Создана новая папка: {folder_name}")
                         return new_folder
@@ -784,16 +2893,54 @@ class TMSTool:
             except ValueError:
                 print("❌ Введите корректный номер")
     
-    def show_project_info(self):
-        """Отображение информации о проектах"""
+    def show_project_info(self, project_id: Optional[int] = None, cache_ttl: Optional[float] = None) -> int:
+        """
+        Отображение информации о проектах
+        
+        Структуры проектов загружаются параллельно (TMS_MAX_WORKERS потоков) и выводятся
+        в порядке списка проектов по мере готовности.
+        
+        Args:
+            project_id: Показать только этот проект (по умолчанию - все)
+            cache_ttl: Использовать снимки структуры не старше стольких секунд
+                (по умолчанию TMS_INFO_CACHE_TTL, 0 - всегда загружать заново)
+            
+        Returns:
+            Код завершения EXIT_*
+        """
         print("\n📊 Информация о проектах")
+        cache_ttl = self.info_cache_ttl if cache_ttl is None else cache_ttl
         
         projects = self.client.get_projects()
+        if project_id is not None:
+            projects = [project for project in projects if project['id'] == project_id]
         if not projects:
             print("❌ Нет доступных проектов")
-            return
+            return EXIT_NOT_FOUND
+        
+        def fetch_summary(project: Dict) -> tuple[Dict, Optional[Dict], bool]:
+            snapshot = ProjectSnapshot(project['id'])
+            summary = snapshot.load(cache_ttl)
+            if summary:
+                return project, summary, True
+            
+            # Получаем структуру проекта
+            project_data = self.client.get_project_with_cases(project['id'])
+            if not project_data:
+                return project, None, False
+            summary = {
+                'taken_at': time.time(),
+                'folders': [
+                    {'id': folder['id'], 'name': folder['name'], 'cases': len(folder.get('Cases', []))}
+                    for folder in project_data.get('Folders', [])
+                ]
+            }
+            if cache_ttl > 0:
+                snapshot.save(summary)
+            return project, summary, False
         
-        for project in projects:
+        failed = 0
+        for project, summary, cached in ordered_parallel_map(fetch_summary, projects, self.max_workers):
             print(f"\n{'='*60}")
             print(f"📁 Проект: {project['name']} (ID: {project['id']})")
             if project.get('detail'):
@@ -801,13 +2948,16 @@ class TMSTool:
             print(f"🌐 Публичный: {'Да' if project.get('isPublic') else 'Нет'}")
             print(f"📅 Создан: {project.get('createdAt', 'Н/Д')}")
             
-            # Получаем структуру проекта
-            project_data = self.client.get_project_with_cases(project['id'])
-            folders = project_data.get('Folders', [])
+            if summary is None:
+                print("❌ Не удалось получить структуру проекта")
+                failed += 1
+                continue
+            if cached:
+                taken_at = datetime.fromtimestamp(summary['taken_at']).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"🗂 Данные из снимка от {taken_at}")
             
-            total_cases = 0
-            for folder in folders:
-                total_cases += len(folder.get('Cases', []))
+            folders = summary['folders']
+            total_cases = sum(folder['cases'] for folder in folders)
             
             print(f"📋 Тест-кейсов: {total_cases}")
             print(f"📁 Папок: {len(folders)}")
@@ -815,8 +2965,9 @@ class TMSTool:
             if folders:
                 print("\n📂 Структура папок:")
                 for folder in folders:
-                    cases_count = len(folder.get('Cases', []))
-                    print(f"  • {folder['name']} (ID: {folder['id']}) - {cases_count} кейсов")
+                    print(f"  • {folder['name']} (ID: {folder['id']}) - {folder['cases']} кейсов")
+        
+        return EXIT_PARTIAL if failed else EXIT_OK
     
     def run(self):
         """Запуск приложения"""
@@ -838,6 +2989,13 @@ class TMSTool:
                     self.import_test_cases()
                 elif choice == "3":
                     self.show_project_info()
+                elif choice == "4":
+                    self.export_delta()
+                elif choice == "5":
+                    spec = input("\nID проектов через запятую или all: ").strip()
+                    projects = self._find_projects(spec) if spec else None
+                    if projects is not None:
+                        self.export_projects(projects)
                 elif choice == "0":
                     print("👋 До свидания!")
                     break
@@ -852,11 +3010,168 @@ class TMSTool:
             except Exception as e:
                 logger.error(f"Неожиданная ошибка: {e}")
                 print(f"❌ Произошла ошибка: {e}")
+    
+    def run_command(self, args) -> int:
+        """
+        Выполнение подкоманды командной строки без интерактивных запросов
+        
+        Args:
+            args: Разобранные аргументы (см. build_arg_parser)
+            
+        Returns:
+            Код завершения EXIT_*
+        """
+        self.interactive = False
+        if getattr(args, 'workers', None):
+            self.max_workers = max(1, args.workers)
+        if getattr(args, 'metrics_file', None):
+            self.metrics_file = args.metrics_file
+        if getattr(args, 'format', None):
+            self.file_format = args.format
+        
+        if not self.setup_client():
+            print("❌ Не удалось подключиться к TMS")
+            return EXIT_CONNECTION
+        
+        try:
+            return getattr(self, f"_command_{args.command}")(args)
+        except KeyboardInterrupt:
+            print("\n👋 Программа прервана пользователем")
+            return EXIT_INTERRUPTED
+        except Exception as e:
+            logger.error(f"Неожиданная ошибка: {e}")
+            return EXIT_ERROR
+    
+    def _command_export(self, args) -> int:
+        """Подкоманда export"""
+        if args.project_ids:
+            if args.resume or args.delta or args.output:
+                print("❌ --resume, --delta и --output не поддерживаются вместе с --project-ids")
+                return EXIT_USAGE
+            if args.compress and self.file_format == 'sqlite':
+                print("❌ --compress не поддерживается для формата sqlite")
+                return EXIT_USAGE
+            projects = self._find_projects(args.project_ids)
+            if projects is None:
+                return EXIT_NOT_FOUND
+            return self.export_projects(projects, args.output_dir, args.parallel_projects, args.compress)
+        
+        if args.compress or args.output_dir or args.parallel_projects:
+            print("❌ --compress, --output-dir и --parallel-projects используются только с --project-ids "
+                  "(для сжатия одного проекта укажите --output с расширением .gz или .zst)")
+            return EXIT_USAGE
+        project = self._find_project(args.project_id)
+        if not project:
+            return EXIT_NOT_FOUND
+        if args.delta:
+            return self.export_delta(project, output=args.output)
+        return self.export_test_cases(project, resume=args.resume, output=args.output)
+    
+    def _command_import(self, args) -> int:
+        """Подкоманда import"""
+        project = self._find_project(args.project_id)
+        if not project:
+            return EXIT_NOT_FOUND
+        self.source_project_id = args.source_project_id
+        self.preserve_order = args.preserve_order
+        return self.import_test_cases(project, args.file, args.default_folder)
+    
+    def _command_info(self, args) -> int:
+        """Подкоманда info"""
+        return self.show_project_info(args.project_id, args.cache_ttl)
+    
+    def _find_projects(self, spec: str) -> Optional[List[Dict]]:
+        """
+        Поиск проектов по списку ID через запятую или 'all' для всех проектов
+        
+        Returns:
+            Список проектов или None, если список некорректен или проект не найден
+        """
+        projects = self.client.get_projects()
+        if spec.strip().lower() == 'all':
+            return projects
+        
+        try:
+            project_ids = [int(part) for part in spec.split(',') if part.strip()]
+        except ValueError:
+            print(f"❌ Некорректный список проектов: {spec}")
+            return None
+        
+        projects_by_id = {project['id']: project for project in projects}
+        missing = [project_id for project_id in project_ids if project_id not in projects_by_id]
+        if missing:
+            print(f"❌ Проекты не найдены: {', '.join(map(str, missing))}")
+            return None
+        return [projects_by_id[project_id] for project_id in dict.fromkeys(project_ids)]
+    
+    def _find_project(self, project_id: int) -> Optional[Dict]:
+        """Поиск проекта пользователя по ID"""
+        for project in self.client.get_projects():
+            if project['id'] == project_id:
+                return project
+        print(f"❌ Проект с ID {project_id} не найден")
+        return None
+
+def build_arg_parser():
+    """Парсер аргументов командной строки для неинтерактивного режима"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="TMS Tool - импорт/экспорт тест-кейсов. Без подкоманды запускается интерактивное меню.",
+        epilog=f"Коды завершения: {EXIT_OK} - успех, {EXIT_ERROR} - ошибка, {EXIT_USAGE} - неверные аргументы, "
+               f"{EXIT_CONNECTION} - ошибка подключения, {EXIT_NOT_FOUND} - не найдено, "
+               f"{EXIT_PARTIAL} - часть тест-кейсов не обработана"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    
+    export_parser = subparsers.add_parser('export', help="Экспорт тест-кейсов проекта в CSV")
+    export_projects = export_parser.add_mutually_exclusive_group(required=True)
+    export_projects.add_argument('--project-id', type=int, help="ID проекта")
+    export_projects.add_argument('--project-ids', help="ID проектов через запятую или 'all' - параллельный экспорт")
+    export_parser.add_argument('--output', help="Путь к CSV файлу")
+    export_parser.add_argument('--output-dir', help="Каталог для CSV файлов и manifest.json (с --project-ids)")
+    export_parser.add_argument('--parallel-projects', type=int,
+                               help="Число одновременно выгружаемых проектов (с --project-ids, по умолчанию до 4)")
+    export_parser.add_argument('--format', choices=FILE_FORMATS,
+                               help="Формат файла (по умолчанию по расширению: .jsonl - JSON Lines, "
+                                    ".sqlite/.db - снимок SQLite, иначе CSV)")
+    export_parser.add_argument('--compress', choices=['gz', 'zst'], help="Сжатие файлов проектов (с --project-ids)")
+    export_parser.add_argument('--resume', action='store_true', help="Продолжить незавершенный экспорт")
+    export_parser.add_argument('--delta', action='store_true', help="Только изменения с прошлого экспорта")
+    export_parser.add_argument('--workers', type=int, help="Число одновременных запросов (TMS_MAX_WORKERS)")
+    export_parser.add_argument('--metrics-file', help="Сохранить метрики запросов в JSON (TMS_METRICS_FILE)")
+    
+    import_parser = subparsers.add_parser('import', help="Импорт тест-кейсов из CSV в проект")
+    import_parser.add_argument('--project-id', type=int, required=True, help="ID проекта")
+    import_parser.add_argument('--file', required=True, help="Путь к CSV файлу")
+    import_parser.add_argument('--format', choices=FILE_FORMATS,
+                               help="Формат файла (по умолчанию по расширению: .jsonl - JSON Lines, "
+                                    ".sqlite/.db - снимок SQLite, иначе CSV)")
+    import_parser.add_argument('--source-project-id', type=int,
+                               help="Проект снимка SQLite, если в нем несколько проектов")
+    import_parser.add_argument('--preserve-order', action='store_true',
+                               help="Создавать кейсы каждой папки строго по порядку файла (меньше параллелизма)")
+    import_parser.add_argument('--default-folder', help="ID, имя или путь папки для нераспределенных тест-кейсов")
+    import_parser.add_argument('--workers', type=int, help="Число одновременных запросов (TMS_MAX_WORKERS)")
+    import_parser.add_argument('--metrics-file', help="Сохранить метрики запросов в JSON (TMS_METRICS_FILE)")
+    
+    info_parser = subparsers.add_parser('info', help="Информация о проектах")
+    info_parser.add_argument('--project-id', type=int, help="Показать только этот проект")
+    info_parser.add_argument('--workers', type=int, help="Число одновременных запросов (TMS_MAX_WORKERS)")
+    info_parser.add_argument('--cache-ttl', type=float,
+                             help="Использовать снимки структуры проектов не старше N секунд (TMS_INFO_CACHE_TTL)")
+    
+    return parser
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     """Точка входа в приложение"""
+    args = build_arg_parser().parse_args(argv)
     tool = TMSTool()
-    tool.run()
+    
+    if args.command is None:
+        tool.run()
+        return EXIT_OK
+    return tool.run_command(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
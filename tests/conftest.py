@@ -0,0 +1,44 @@
+"""
+Общие фикстуры тестов: fake TMS сервер и окружение TMS Tool
+
+Тесты выполняются во временном каталоге, поэтому журналы экспорта и импорта
+(.tms_*) не попадают в рабочую копию.
+"""
+
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_server import FakeTMSServer
+
+
+@pytest.fixture
+def tms_server(tmp_path, monkeypatch):
+    """Fake TMS сервер (1 проект, 4 папки по 10 пошаговых кейсов) и переменные окружения для main.py"""
+    monkeypatch.chdir(tmp_path)
+    with FakeTMSServer(folders=4, cases_per_folder=10, steps=3) as server:
+        monkeypatch.setenv('TMS_BASE_URL', server.base_url)
+        monkeypatch.setenv('TMS_EMAIL', 'test@example.com')
+        monkeypatch.setenv('TMS_PASSWORD', 'test')
+        monkeypatch.setenv('TMS_MAX_WORKERS', '4')
+        monkeypatch.setenv('TMS_MAX_RETRIES', '0')
+        monkeypatch.delenv('TMS_CASE_CACHE', raising=False)
+        monkeypatch.delenv('TMS_METRICS_FILE', raising=False)
+        yield server
+
+
+def fail_requests(server, monkeypatch, method: str, pattern: str, ids: set) -> None:
+    """Ответ 502 на запросы method к пути pattern (с группой ID), если ID входит в ids"""
+    handle = server.handle
+
+    def flaky_handle(request_method, path, headers, payload):
+        match = re.fullmatch(pattern, path)
+        if request_method == method and match and int(match.group(1)) in ids:
+            return 502, {'error': 'Injected failure'}, {}
+        return handle(request_method, path, headers, payload)
+
+    monkeypatch.setattr(server, 'handle', flaky_handle)
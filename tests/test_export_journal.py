@@ -0,0 +1,48 @@
+"""Возобновляемый экспорт: журнал контрольных точек и обрезка недописанного CSV"""
+
+from collections import Counter
+
+import main as tms
+from main import CSVHandler
+from conftest import fail_requests
+
+
+def exported_ids(file_path) -> Counter:
+    return Counter(case['id'] for _, case in CSVHandler.iter_cases_from_csv(str(file_path)))
+
+
+def test_resumed_export_has_no_duplicate_or_missing_cases(tms_server, tmp_path, monkeypatch):
+    all_ids = {str(case_id) for case_id in tms_server.data.cases}
+    failing = {case_id for case_id in tms_server.data.cases if case_id % 7 == 0}
+    output = tmp_path / 'export.csv'
+
+    fail_requests(tms_server, monkeypatch, 'GET', r'/cases/(\d+)', failing)
+    assert tms.main(['export', '--project-id', '1', '--output', str(output)]) == tms.EXIT_PARTIAL
+    assert set(exported_ids(output)) == all_ids - {str(case_id) for case_id in failing}
+
+    # Прерывание посреди записи кейса: хвост после последней контрольной точки должен быть отброшен
+    with open(output, 'a', encoding='utf-8') as partial_file:
+        partial_file.write('999999;Недописанный кейс;0;1')
+
+    failing.clear()
+    assert tms.main(['export', '--project-id', '1', '--resume']) == tms.EXIT_OK
+
+    ids = exported_ids(output)
+    assert set(ids) == all_ids
+    assert max(ids.values()) == 1
+    assert not list(tmp_path.glob('.tms_export_*'))
+
+
+def test_export_without_resume_starts_over(tms_server, tmp_path, monkeypatch):
+    failing = {case_id for case_id in tms_server.data.cases if case_id % 5 == 0}
+    output = tmp_path / 'export.csv'
+
+    fail_requests(tms_server, monkeypatch, 'GET', r'/cases/(\d+)', failing)
+    assert tms.main(['export', '--project-id', '1', '--output', str(output)]) == tms.EXIT_PARTIAL
+
+    failing.clear()
+    assert tms.main(['export', '--project-id', '1', '--output', str(output)]) == tms.EXIT_OK
+
+    ids = exported_ids(output)
+    assert set(ids) == {str(case_id) for case_id in tms_server.data.cases}
+    assert max(ids.values()) == 1
@@ -0,0 +1,17 @@
+"""Подготовка папок при импорте"""
+
+import main as tms
+from conftest import fail_requests
+
+
+def test_import_aborts_when_folder_list_fails(tms_server, tmp_path, monkeypatch):
+    output = tmp_path / 'export.csv'
+    assert tms.main(['export', '--project-id', '1', '--output', str(output)]) == tms.EXIT_OK
+    folders_before = len(tms_server.data.folders)
+    cases_before = len(tms_server.data.cases)
+
+    fail_requests(tms_server, monkeypatch, 'GET', r'/folders\?projectId=(\d+)', {1})
+    assert tms.main(['import', '--project-id', '1', '--file', str(output)]) == tms.EXIT_CONNECTION
+
+    assert len(tms_server.data.folders) == folders_before
+    assert len(tms_server.data.cases) == cases_before
@@ -0,0 +1,38 @@
+"""Повторный импорт: журнал созданных кейсов не дает создать дубликаты"""
+
+import main as tms
+from conftest import fail_requests
+
+
+def export_project(tmp_path):
+    output = tmp_path / 'export.csv'
+    assert tms.main(['export', '--project-id', '1', '--output', str(output)]) == tms.EXIT_OK
+    return output
+
+
+def test_repeated_import_creates_no_new_cases(tms_server, tmp_path):
+    csv_path = export_project(tmp_path)
+    listed = len(tms_server.data.cases)
+
+    assert tms.main(['import', '--project-id', '1', '--file', str(csv_path)]) == tms.EXIT_OK
+    assert len(tms_server.data.cases) == 2 * listed
+
+    assert tms.main(['import', '--project-id', '1', '--file', str(csv_path)]) == tms.EXIT_OK
+    assert len(tms_server.data.cases) == 2 * listed
+
+
+def test_rerun_after_failed_steps_only_retries_steps(tms_server, tmp_path, monkeypatch):
+    csv_path = export_project(tmp_path)
+    original_ids = set(tms_server.data.cases)
+    failing = {case_id for case_id in range(1, 1000) if case_id % 3 == 0}
+
+    fail_requests(tms_server, monkeypatch, 'POST', r'/steps/update\?caseId=(\d+)', failing)
+    assert tms.main(['import', '--project-id', '1', '--file', str(csv_path)]) == tms.EXIT_OK
+    created_ids = set(tms_server.data.cases) - original_ids
+    assert len(created_ids) == len(original_ids)
+    assert any(not tms_server.data.cases[case_id].get('Steps') for case_id in created_ids)
+
+    failing.clear()
+    assert tms.main(['import', '--project-id', '1', '--file', str(csv_path)]) == tms.EXIT_OK
+    assert set(tms_server.data.cases) - original_ids == created_ids
+    assert all(len(tms_server.data.cases[case_id]['Steps']) == 3 for case_id in created_ids)
@@ -0,0 +1,24 @@
+"""Метрики запросов и соединений"""
+
+import json
+
+import main as tms
+
+
+def test_connection_stats_are_per_run(tms_server, tmp_path):
+    tool = tms.TMSTool()
+    tool.interactive = False
+    assert tool.setup_client()
+    project = next(p for p in tool.client.get_projects() if p['id'] == 1)
+
+    runs = []
+    for run in range(2):
+        tool.metrics_file = str(tmp_path / f'metrics{run}.json')
+        output = str(tmp_path / f'export{run}.csv')
+        assert tool.export_test_cases(project, resume=False, output=output) == tms.EXIT_OK
+        with open(tool.metrics_file, encoding='utf-8') as f:
+            runs.append(json.load(f)['connections'])
+
+    assert runs[0]['requests'] > 0
+    assert runs[1]['requests'] == runs[0]['requests']
+    assert runs[1]['connections'] <= runs[0]['connections']